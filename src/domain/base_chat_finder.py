@@ -12,15 +12,27 @@ import pathlib
 import time
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from functools import lru_cache
+from typing import List, Optional, Dict, Any, Union
+
+
+@lru_cache(maxsize=4096)
+def _hash_unique_key(finder_type: str, unique_key: Union[str, bytes]) -> str:
+    """Hash a finder-scoped key into a 16 hex character ID, memoized per key."""
+    if isinstance(unique_key, str):
+        unique_key = unique_key.encode('utf-8')
+    full_key = finder_type.encode('utf-8') + b":" + unique_key
+    # 8-byte digest gives exactly 16 hex characters without truncation
+    return hashlib.blake2b(full_key, digest_size=8).hexdigest()
 
 
 class BaseChatFinder(ABC):
     """Abstract base class for all chat finders."""
     
-    def __init__(self):
-        """Initialize the chat finder."""
-        self._finder_type = self.__class__.__name__.replace("ChatFinder", "").lower()
+    def __init_subclass__(cls, **kwargs):
+        """Derive the finder type once per subclass from its class name."""
+        super().__init_subclass__(**kwargs)
+        cls._finder_type = cls.__name__.replace("ChatFinder", "").lower()
     
     @abstractmethod
     def get_storage_root(self) -> Optional[pathlib.Path]:
@@ -93,17 +105,17 @@ class BaseChatFinder(ABC):
         except Exception:
             return "UTC+0"  # Default fallback
     
-    def _generate_unique_id(self, unique_key: str) -> str:
+    def _generate_unique_id(self, unique_key: Union[str, bytes]) -> str:
         """Generate a unique hash-based ID for a chat.
         
         Args:
-            unique_key: Unique identifier string (e.g., "claude:project/file.jsonl")
+            unique_key: Unique identifier string (e.g., "claude:project/file.jsonl"),
+                or its already-encoded bytes
             
         Returns:
             Short unique ID (16 hex characters).
         """
-        full_key = f"{self._finder_type}:{unique_key}"
-        return hashlib.sha256(full_key.encode('utf-8')).hexdigest()[:16]
+        return _hash_unique_key(self._finder_type, unique_key)
     
     def _get_result_dir(self) -> pathlib.Path:
         """Get the result directory path.
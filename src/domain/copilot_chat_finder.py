@@ -7,44 +7,96 @@ import platform
 import datetime
 import time
 import re
-from typing import List, Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Optional, Dict, Any, Tuple
+
+import orjson
 
 from .base_chat_finder import BaseChatFinder
 from .tool_normalizer import tool_name_normalization
 
 """This module exports Copilot chat JSON files in the new standardized format."""
 
+_UTC = datetime.timezone.utc
+
+_REF_PATH_KEYS = ("fsPath", "path")
+_EXPORT_JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+
+
+def _dump_export_json(data: Any) -> bytes:
+    """Serialize export data to UTF-8 JSON bytes.
+    
+    Uses orjson, falling back to the json module for values orjson rejects
+    (e.g. integers beyond 64 bits), so one odd value does not abort an export.
+    """
+    try:
+        return orjson.dumps(data, option=_EXPORT_JSON_OPTIONS)
+    except TypeError:
+        return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8") + b"\n"
+
 
 class CopilotChatFinder(BaseChatFinder):
     """Find and extract GitHub Copilot chat histories from VS Code."""
 
+    def __init__(self):
+        """Initialize the Copilot chat finder and its response segment handlers."""
+        super().__init__()
+        # Set by get_storage_root once an existing storage root is found
+        self._storage_root_cache: Optional[pathlib.Path] = None
+        # Response entity kind -> handler, looked up once per entity
+        self._code_block_handlers = {
+            "codeblockUri": self._read_codeblock_uri,
+            "textEditGroup": self._read_text_edit_group,
+        }
+        self._tool_segment_handlers = {
+            "toolInvocationSerialized": self._tool_invocation_to_usage,
+        }
+
     def get_storage_root(self) -> Optional[pathlib.Path]:
         """Return the path to VS Code's `workspaceStorage` directory.
 
         Tries standard Code and Code - Insiders locations on Windows/macOS/Linux.
-        Returns None if platform is unsupported.
+        Returns None if platform is unsupported. A root that exists is cached per
+        instance; a missing one is looked up again on the next call, so storage
+        created later is still picked up.
         """
-        home = pathlib.Path.home()
-        system = platform.system()
+        if self._storage_root_cache is not None:
+            return self._storage_root_cache
+        root = self._compute_storage_root()
+        if root is not None:
+            self._storage_root_cache = root
+            return root
+        # Return first candidate even if missing so caller can inspect
+        candidates = self._candidate_storage_roots(platform.system(), str(pathlib.Path.home()))
+        return candidates[0] if candidates else None
+
+    def _compute_storage_root(self) -> Optional[pathlib.Path]:
+        """Return the first existing `workspaceStorage` directory for this platform, or None."""
+        candidates = self._candidate_storage_roots(platform.system(), str(pathlib.Path.home()))
+        for p in candidates:
+            if p.exists():
+                return p
+        return None
 
-        candidates: List[pathlib.Path] = []
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _candidate_storage_roots(system: str, home: str) -> Tuple[pathlib.Path, ...]:
+        """Return candidate `workspaceStorage` paths for a platform and home directory.
+
+        Memoized on (system, home); existence checks are left to the caller so
+        newly created storage directories are still picked up.
+        """
+        home_path = pathlib.Path(home)
         if system == "Windows":
-            base = home / "AppData" / "Roaming"
-            candidates = [base / d / "User" / "workspaceStorage" for d in ("Code", "Code - Insiders")]
+            base = home_path / "AppData" / "Roaming"
         elif system == "Darwin":
-            base = home / "Library" / "Application Support"
-            candidates = [base / d / "User" / "workspaceStorage" for d in ("Code", "Code - Insiders")]
+            base = home_path / "Library" / "Application Support"
         elif system == "Linux":
-            base = home / ".config"
-            candidates = [base / d / "User" / "workspaceStorage" for d in ("Code", "Code - Insiders")]
+            base = home_path / ".config"
         else:
-            return None
-
-        for p in candidates:
-            if p.exists():
-                return p
-        # Return first candidate even if missing so caller can inspect
-        return candidates[0] if candidates else None
+            return ()
+        return tuple(base / d / "User" / "workspaceStorage" for d in ("Code", "Code - Insiders"))
 
     def _generate_chat_id(self, file_path_or_key: Any) -> str:
         """Generate unique chat ID from file path or database key.
@@ -58,10 +110,11 @@ class CopilotChatFinder(BaseChatFinder):
         if not isinstance(file_path_or_key, pathlib.Path):
             return ""
         
-        # Create unique key from workspace_id and file name
+        # Create unique key from workspace_id and file name as filesystem bytes;
+        # os.fsencode also round-trips names that aren't valid UTF-8
         workspace_id = file_path_or_key.parent.parent.name
         file_name = file_path_or_key.name
-        unique_key = f"{workspace_id}/{file_name}"
+        unique_key = os.fsencode(workspace_id) + b"/" + os.fsencode(file_name)
         
         return self._generate_unique_id(unique_key)
 
@@ -142,15 +195,16 @@ class CopilotChatFinder(BaseChatFinder):
 
     # get_chat_metadata_list and parse_chat_by_id are inherited from base class
 
-    def _timestamp_ms_to_iso(self, timestamp_ms: Optional[int]) -> str:
-        """Convert milliseconds timestamp to ISO format string."""
+    def _timestamp_ms_to_iso(self, timestamp_ms: Optional[float]) -> str:
+        """Convert milliseconds timestamp to ISO format string (e.g. 2021-01-01T00:00:00.000000Z)."""
         if not timestamp_ms:
-            return datetime.datetime.now(tz=datetime.timezone.utc).isoformat().replace('+00:00', 'Z')
+            timestamp_ms = time.time() * 1000
         
-        # Convert milliseconds to seconds
-        timestamp_sec = timestamp_ms / 1000.0
-        dt = datetime.datetime.fromtimestamp(timestamp_sec, tz=datetime.timezone.utc)
-        return dt.isoformat().replace('+00:00', 'Z')
+        # Round to whole microseconds (keeping any sub-millisecond part of a float
+        # timestamp), then split into seconds and microseconds with integer math
+        seconds, micros = divmod(round(timestamp_ms * 1000), 1_000_000)
+        dt = datetime.datetime.fromtimestamp(seconds, _UTC)
+        return dt.strftime(f"%Y-%m-%dT%H:%M:%S.{micros:06d}Z")
 
     def _extract_workspace_path_from_json(self, ws_json_path: pathlib.Path) -> Optional[str]:
         """Extract a file system path from workspace.json if present."""
@@ -193,55 +247,47 @@ class CopilotChatFinder(BaseChatFinder):
         
         return "Unknown Project"
 
-    def _extract_text_from_value(self, value_obj: Any) -> str:
+    def _extract_text_from_value(self, value_obj: object) -> str:
         """Extract text content from a value object (can be string or dict with value field)."""
+        # Plain strings are by far the most common case, so test for them first
         if isinstance(value_obj, str):
             return value_obj
-        elif isinstance(value_obj, dict):
-            return value_obj.get("value", "")
+        if isinstance(value_obj, dict):
+            text = value_obj.get("value", "")
+            return text if isinstance(text, str) else ""
         return ""
 
-    def _extract_file_path_from_inline_reference(self, inline_ref: Dict[str, Any]) -> Optional[str]:
+    def _extract_file_path_from_inline_reference(self, inline_ref: object) -> Optional[str]:
         """Extract file path from inlineReference entity."""
         if not isinstance(inline_ref, dict):
             return None
         
-        # Check for direct fsPath
-        fs_path = inline_ref.get("fsPath")
-        if fs_path:
-            return fs_path
-        
-        # Check for path
-        path = inline_ref.get("path")
-        if path:
-            return path
+        # Check for direct fsPath, then path
+        for key in _REF_PATH_KEYS:
+            path = inline_ref.get(key)
+            if path:
+                return path
         
         # Check for location.uri.fsPath (for code references)
-        location = inline_ref.get("location", {})
+        location = inline_ref.get("location")
         if isinstance(location, dict):
-            uri = location.get("uri", {})
+            uri = location.get("uri")
             if isinstance(uri, dict):
-                fs_path = uri.get("fsPath")
-                if fs_path:
-                    return fs_path
-                path = uri.get("path")
-                if path:
-                    return path
+                for key in _REF_PATH_KEYS:
+                    path = uri.get(key)
+                    if path:
+                        return path
         
         return None
 
     def _convert_inline_reference_to_markdown(self, inline_ref: Dict[str, Any]) -> str:
         """Convert inlineReference to markdown file reference format."""
-        file_path = self._extract_file_path_from_inline_reference(inline_ref)
-        if file_path:
-            return f"`{file_path}`"
-        
-        # If no file path, try to use name
-        name = inline_ref.get("name", "")
-        if name:
-            return f"`{name}`"
+        if not isinstance(inline_ref, dict):
+            return ""
         
-        return ""
+        # Fall back to the reference name when there is no file path
+        reference = self._extract_file_path_from_inline_reference(inline_ref) or inline_ref.get("name")
+        return f"`{reference}`" if reference else ""
 
     def _extract_tool_input(self, tool_invocation: Dict[str, Any], tool_id: str) -> Dict[str, Any]:
         """Extract tool input from tool invocation."""
@@ -611,6 +657,35 @@ class CopilotChatFinder(BaseChatFinder):
             "tool_output": normalized_output
         }
 
+    def _read_codeblock_uri(self, entity: Dict[str, Any], code_block: Dict[str, Any]) -> None:
+        """Store the target file path of a `codeblockUri` entity in `code_block`."""
+        uri = entity.get("uri", {})
+        if isinstance(uri, dict):
+            code_block["file_path"] = uri.get("fsPath") or uri.get("path", "")
+
+    def _read_text_edit_group(self, entity: Dict[str, Any], code_block: Dict[str, Any]) -> None:
+        """Store the text of the first edit of a `textEditGroup` entity in `code_block`."""
+        edits = entity.get("edits", [])
+        if edits and isinstance(edits, list):
+            # Get the first edit group
+            first_edit_group = edits[0]
+            if isinstance(first_edit_group, list) and len(first_edit_group) > 0:
+                first_edit = first_edit_group[0]
+                if isinstance(first_edit, dict):
+                    code_block["code"] = first_edit.get("text", "")
+
+    def _tool_invocation_to_usage(self, entity: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Convert a `toolInvocationSerialized` entity to a normalized tool usage."""
+        tool_id = entity.get("toolId", "")
+        if not tool_id:
+            return None
+        
+        tool_output = self._extract_tool_output(entity)
+        tool_input = self._extract_tool_input(entity, tool_id)
+        
+        # Normalize tool usage using Copilot-specific logic
+        return self._normalize_copilot_tool_usage(tool_id, tool_input if tool_input else {}, tool_output)
+
     def _transform_chat_to_new_format(self, raw_data: Dict[str, Any], workspace_id: str, storage_root: pathlib.Path) -> Optional[Dict[str, Any]]:
         """Transform a single chat from raw format to new standardized format."""
         # Extract title
@@ -706,26 +781,15 @@ class CopilotChatFinder(BaseChatFinder):
                             i += 1
                         
                         # Extract code block information
-                        file_path = None
-                        code_content = None
+                        code_block: Dict[str, Any] = {"file_path": None, "code": None}
                         
                         for code_entity in code_block_entities:
-                            # Extract file path from codeblockUri
-                            if code_entity.get("kind") == "codeblockUri":
-                                uri = code_entity.get("uri", {})
-                                if isinstance(uri, dict):
-                                    file_path = uri.get("fsPath") or uri.get("path", "")
-                            
-                            # Extract code from textEditGroup
-                            elif code_entity.get("kind") == "textEditGroup":
-                                edits = code_entity.get("edits", [])
-                                if edits and isinstance(edits, list) and len(edits) > 0:
-                                    # Get the first edit group
-                                    first_edit_group = edits[0]
-                                    if isinstance(first_edit_group, list) and len(first_edit_group) > 0:
-                                        first_edit = first_edit_group[0]
-                                        if isinstance(first_edit, dict):
-                                            code_content = first_edit.get("text", "")
+                            handler = self._code_block_handlers.get(code_entity.get("kind"))
+                            if handler:
+                                handler(code_entity, code_block)
+                        
+                        file_path = code_block["file_path"]
+                        code_content = code_block["code"]
                         
                         # Create codeBlock tool message if we have code
                         if code_content or file_path:
@@ -752,30 +816,22 @@ class CopilotChatFinder(BaseChatFinder):
                         
                         continue
                     
-                    # Skip entities with kind (except toolInvocationSerialized)
+                    # Skip entities with kind that have no tool handler
+                    # (thinking, progressTaskSerialized, etc.)
                     if "kind" in entity:
-                        if entity.get("kind") == "toolInvocationSerialized":
-                            # Extract tool invocation
-                            tool_id = entity.get("toolId", "")
-                            if tool_id:
-                                tool_output = self._extract_tool_output(entity)
-                                tool_input = self._extract_tool_input(entity, tool_id)
-                                
-                                # Normalize tool usage using Copilot-specific logic
-                                normalized = self._normalize_copilot_tool_usage(tool_id, tool_input if tool_input else {}, tool_output)
-                                
-                                if normalized:
-                                    # Increment timestamp for tool message
-                                    current_time_ms += message_interval_ms
-                                    tool_timestamp = self._timestamp_ms_to_iso(current_time_ms)
-                                    
-                                    messages.append({
-                                        "role": "assistant",
-                                        "type": "tool",
-                                        "content": normalized,
-                                        "timestamp": tool_timestamp
-                                    })
-                        # Skip other kinds (thinking, progressTaskSerialized, etc.)
+                        handler = self._tool_segment_handlers.get(entity.get("kind"))
+                        normalized = handler(entity) if handler else None
+                        if normalized:
+                            # Increment timestamp for tool message
+                            current_time_ms += message_interval_ms
+                            tool_timestamp = self._timestamp_ms_to_iso(current_time_ms)
+                            
+                            messages.append({
+                                "role": "assistant",
+                                "type": "tool",
+                                "content": normalized,
+                                "timestamp": tool_timestamp
+                            })
                         i += 1
                         continue
                     
@@ -862,20 +918,47 @@ class CopilotChatFinder(BaseChatFinder):
 
         chat_files: List[pathlib.Path] = []
 
-        for ws_dir in storage_root.iterdir():
-            if not ws_dir.is_dir():
-                continue
+        # scandir exposes the entry type without extra stat calls, and Path objects
+        # are only built for the JSON files that are actually returned
+        try:
+            ws_entries = os.scandir(storage_root)
+        except OSError:
+            # Unreadable storage root: nothing to list
+            return []
 
-            # Look for chat sessions directory
-            chat_dir = ws_dir / "chatSessions"
-            if not chat_dir.exists() or not chat_dir.is_dir():
-                continue
+        with ws_entries:
+            for ws_entry in ws_entries:
+                if not ws_entry.is_dir():
+                    continue
+
+                # Look for chat sessions directory
+                chat_dir = os.path.join(ws_entry.path, "chatSessions")
+                try:
+                    with os.scandir(chat_dir) as chat_entries:
+                        # Case-insensitive like Path.glob on Windows, so CHAT.JSON is kept
+                        names = [
+                            entry.name for entry in chat_entries
+                            if entry.name.lower().endswith(".json") and entry.is_file()
+                        ]
+                except OSError:
+                    # Missing, not a directory, or unreadable: skip this workspace
+                    continue
 
-            # Collect all JSON files
-            chat_files.extend(sorted(chat_dir.glob("*.json")))
+                # Collect all JSON files
+                chat_dir_path = pathlib.Path(chat_dir)
+                chat_files.extend(chat_dir_path / name for name in sorted(names))
 
         return chat_files
 
+    def _transform_chat_file(self, chat_file: pathlib.Path, storage_root: pathlib.Path) -> Optional[Dict[str, Any]]:
+        """Read and transform a single chat file, returning None if it can't be read/parsed."""
+        try:
+            raw_data = json.loads(chat_file.read_text(encoding="utf-8"))
+            workspace_id = chat_file.parent.parent.name
+            return self._transform_chat_to_new_format(raw_data, workspace_id, storage_root)
+        except Exception:
+            return None
+
     def export_chats(self, output_path: pathlib.Path) -> List[Dict[str, Any]]:
         """Export all Copilot chat JSON files in the new standardized format.
         
@@ -890,32 +973,21 @@ class CopilotChatFinder(BaseChatFinder):
         
         if not chat_files or not storage_root:
             result: List[Dict[str, Any]] = []
-            output_path.write_text(
-                json.dumps(result, ensure_ascii=False, indent=2),
-                encoding="utf-8"
-            )
+            output_path.write_bytes(_dump_export_json(result))
             return result
 
-        # Transform all chats to new format
-        transformed_chats: List[Dict[str, Any]] = []
-        
-        for chat_file in chat_files:
-            try:
-                raw_data = json.loads(chat_file.read_text(encoding="utf-8"))
-                workspace_id = chat_file.parent.parent.name
-                
-                transformed_chat = self._transform_chat_to_new_format(raw_data, workspace_id, storage_root)
-                if transformed_chat:
-                    transformed_chats.append(transformed_chat)
-            except Exception:
-                # Skip files that can't be read/parsed
-                continue
-
-        # Save to file
-        output_path.write_text(
-            json.dumps(transformed_chats, ensure_ascii=False, indent=2),
-            encoding="utf-8"
-        )
+        # Transform all chats to new format; reading and decoding files is I/O-bound,
+        # so fan out over threads. map() keeps the original file order.
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(
+                lambda chat_file: self._transform_chat_file(chat_file, storage_root),
+                chat_files
+            )
+            transformed_chats: List[Dict[str, Any]] = [chat for chat in results if chat]
+
+        # Save to file as UTF-8 bytes
+        output_path.write_bytes(_dump_export_json(transformed_chats))
         
         return transformed_chats
 
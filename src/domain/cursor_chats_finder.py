@@ -17,6 +17,8 @@ from collections import defaultdict
 from typing import Dict, Any, Iterable, List, Optional
 from pathlib import Path
 
+import orjson
+
 from .base_chat_finder import BaseChatFinder
 from .tool_normalizer import tool_name_normalization
 
@@ -227,7 +229,7 @@ class CursorChatFinder(BaseChatFinder):
                         row = cur.fetchone()
                         if row:
                             try:
-                                composer_data = json.loads(row[0])
+                                composer_data = _json_loads(row[0])
                                 comp_title = composer_data.get("name", "")
                                 if comp_title:
                                     title = comp_title
@@ -445,7 +447,7 @@ class CursorChatFinder(BaseChatFinder):
                         row = cur.fetchone()
                         if row:
                             try:
-                                composer_data = json.loads(row[0])
+                                composer_data = _json_loads(row[0])
                                 comp_title = composer_data.get("name", "")
                                 if comp_title:
                                     title = comp_title
@@ -512,11 +514,23 @@ def cursor_root() -> pathlib.Path:
 ################################################################################
 # Helpers
 ################################################################################
+def _json_loads(value):
+    """Parse a JSON value stored in a Cursor database (str or bytes).
+    
+    orjson handles the common case; the stdlib parser is kept as a fallback for
+    documents orjson rejects but json accepts (NaN, integers beyond 64 bits).
+    Raises json.JSONDecodeError for text that is not JSON at all.
+    """
+    try:
+        return orjson.loads(value)
+    except orjson.JSONDecodeError:
+        return json.loads(value)
+
 def j(cur: sqlite3.Cursor, table: str, key: str):
     cur.execute(f"SELECT value FROM {table} WHERE key=?", (key,))
     row = cur.fetchone()
     if row:
-        try:    return json.loads(row[0])
+        try:    return _json_loads(row[0])
         except Exception as e: 
             logger.debug(f"Failed to parse JSON for {key}: {e}")
     return None
@@ -934,7 +948,7 @@ def iter_bubbles_from_disk_kv(db: pathlib.Path) -> Iterable[Dict[str, Any]]:
             if v is None:
                 continue
                 
-            b = json.loads(v)
+            b = _json_loads(v)
         except Exception as e:
             logger.debug(f"Failed to parse bubble JSON for key {k}: {e}")
             continue
@@ -1044,7 +1058,7 @@ def iter_chat_from_item_table(db: pathlib.Path) -> Iterable[Dict[str, Any]]:
                 cur.execute("SELECT key, value FROM ItemTable WHERE key LIKE ?", (f"{key_prefix}%",))
                 for k, v in cur.fetchall():
                     try:
-                        data = json.loads(v)
+                        data = _json_loads(v)
                         if isinstance(data, list):
                             for item in data:
                                 if "id" in item and "text" in item:
@@ -1098,7 +1112,7 @@ def iter_composer_data(db: pathlib.Path) -> Iterable[tuple[str,dict,str]]:
             if v is None:
                 continue
                 
-            composer_data = json.loads(v)
+            composer_data = _json_loads(v)
             composer_id = k.split(":")[1]
             yield composer_id, composer_data, db_path_str
             
@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for tests.
+"""
+
+from typing import Any, Dict, List
+
+
+def group_messages_by_type(messages: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Group parsed chat messages by their "type" field, keeping their order."""
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for message in messages:
+        groups.setdefault(message.get("type"), []).append(message)
+    return groups
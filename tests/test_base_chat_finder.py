@@ -4,8 +4,10 @@ Unit tests for BaseChatFinder.
 """
 
 import pytest
+import hashlib
 import pathlib
-from unittest.mock import Mock, patch
+import tempfile
+from unittest.mock import patch
 from src.domain.base_chat_finder import BaseChatFinder
 
 
@@ -70,6 +72,20 @@ class TestBaseChatFinder:
         chat_id3 = finder._generate_unique_id("different_key")
         assert chat_id != chat_id3
     
+    def test_generate_unique_id_bytes_key(self):
+        """Test that a bytes key yields the same ID as its str form."""
+        finder = ConcreteChatFinder()
+        chat_id = finder._generate_unique_id("key_123")
+        assert finder._generate_unique_id(b"key_123") == chat_id
+        assert ConcreteChatFinder()._generate_unique_id(b"key_123") == chat_id
+    
+    def test_finder_type_set_per_class(self):
+        """Test that the finder type is derived once per class and salts its IDs."""
+        assert vars(ConcreteChatFinder)["_finder_type"] == "concrete"
+        # IDs are the hash of "<type>:<key>"
+        expected = hashlib.blake2b(b"concrete:test_key_123", digest_size=8).hexdigest()
+        assert ConcreteChatFinder()._generate_unique_id("test_key_123") == expected
+    
     def test_get_chat_metadata_list(self):
         """Test that get_chat_metadata_list returns list of metadata."""
         finder = ConcreteChatFinder()
@@ -143,7 +159,6 @@ class TestBaseChatFinder:
     def test_ensure_output_dir(self):
         """Test that _ensure_output_dir creates parent directories."""
         finder = ConcreteChatFinder()
-        import tempfile
         with tempfile.TemporaryDirectory() as tmpdir:
             output_path = pathlib.Path(tmpdir) / "subdir" / "file.json"
             finder._ensure_output_dir(output_path)
@@ -7,8 +7,7 @@ import pytest
 import json
 import pathlib
 import tempfile
-import shutil
-from unittest.mock import Mock, patch, mock_open
+from unittest.mock import patch
 from src.domain.claude_chat_finder import ClaudeChatFinder
 
 
@@ -5,11 +5,46 @@ Unit tests for CopilotChatFinder.
 
 import pytest
 import json
+import os
 import pathlib
 import tempfile
-import platform
-from unittest.mock import Mock, patch
+from unittest.mock import patch
 from src.domain.copilot_chat_finder import CopilotChatFinder
+from tests.helpers import group_messages_by_type
+
+
+# Minimal chat session, serialized once; tests substitute the id and title
+_CHAT_TEMPLATE = json.dumps({
+    "sessionId": "__SID__",
+    "customTitle": "__TITLE__",
+    "creationDate": 1609459200000,  # 2021-01-01
+    "requests": [{
+        "message": {"text": "Hello"},
+        "response": [{"value": "Hi there"}]
+    }]
+}).encode("utf-8")
+
+
+def _chat_bytes(session_id="12345", title="Test Chat"):
+    """Return the serialized chat template with the given session id and title."""
+    return (_CHAT_TEMPLATE
+            .replace(b"__SID__", json.dumps(session_id)[1:-1].encode("utf-8"))
+            .replace(b"__TITLE__", json.dumps(title)[1:-1].encode("utf-8")))
+
+
+@pytest.fixture
+def chat_ws(tmp_path):
+    """Storage root with a `workspace1/chatSessions` dir and a chat file writer."""
+    workspace_dir = tmp_path / "workspace1"
+    chat_dir = workspace_dir / "chatSessions"
+    chat_dir.mkdir(parents=True)
+    
+    def make_chat(name, data):
+        chat_file = chat_dir / name
+        chat_file.write_bytes(data if isinstance(data, bytes) else data.encode("utf-8"))
+        return chat_file
+    
+    return tmp_path, workspace_dir, make_chat
 
 
 class TestCopilotChatFinder:
@@ -21,39 +56,19 @@ class TestCopilotChatFinder:
         assert finder._finder_type == "copilot"
         assert isinstance(finder, CopilotChatFinder)
     
-    def test_get_storage_root_windows(self):
-        """Test getting Copilot storage root on Windows."""
-        finder = CopilotChatFinder()
-        with patch('platform.system', return_value='Windows'), \
-             patch('pathlib.Path.home', return_value=pathlib.Path("C:/Users/test")):
+    @pytest.mark.parametrize("system,home,expected", [
+        ("Windows", "C:/Users/test", "C:/Users/test/AppData/Roaming/Code/User/workspaceStorage"),
+        ("Darwin", "/Users/test", "/Users/test/Library/Application Support/Code/User/workspaceStorage"),
+        ("Linux", "/home/test", "/home/test/.config/Code/User/workspaceStorage"),
+        ("Unknown", "/home/test", None),
+    ])
+    def test_get_storage_root(self, system, home, expected):
+        """Test getting Copilot storage root on each supported platform."""
+        finder = CopilotChatFinder()
+        with patch('platform.system', return_value=system), \
+             patch('pathlib.Path.home', return_value=pathlib.Path(home)):
             result = finder.get_storage_root()
-            expected = pathlib.Path("C:/Users/test/AppData/Roaming/Code/User/workspaceStorage")
-            assert result == expected
-    
-    def test_get_storage_root_darwin(self):
-        """Test getting Copilot storage root on macOS."""
-        finder = CopilotChatFinder()
-        with patch('platform.system', return_value='Darwin'), \
-             patch('pathlib.Path.home', return_value=pathlib.Path("/Users/test")):
-            result = finder.get_storage_root()
-            expected = pathlib.Path("/Users/test/Library/Application Support/Code/User/workspaceStorage")
-            assert result == expected
-    
-    def test_get_storage_root_linux(self):
-        """Test getting Copilot storage root on Linux."""
-        finder = CopilotChatFinder()
-        with patch('platform.system', return_value='Linux'), \
-             patch('pathlib.Path.home', return_value=pathlib.Path("/home/test")):
-            result = finder.get_storage_root()
-            expected = pathlib.Path("/home/test/.config/Code/User/workspaceStorage")
-            assert result == expected
-    
-    def test_get_storage_root_unsupported(self):
-        """Test getting storage root on unsupported platform."""
-        finder = CopilotChatFinder()
-        with patch('platform.system', return_value='Unknown'):
-            result = finder.get_storage_root()
-            assert result is None
+            assert result == (pathlib.Path(expected) if expected else None)
     
     def test_get_storage_root_prefers_existing(self):
         """Test that existing storage path is preferred."""
@@ -69,6 +84,40 @@ class TestCopilotChatFinder:
                 expected = pathlib.Path("C:/Users/test/AppData/Roaming/Code - Insiders/User/workspaceStorage")
                 assert result == expected
     
+    def test_get_storage_root_cached(self, tmp_path):
+        """Test that an existing storage root is resolved once per instance."""
+        finder = CopilotChatFinder()
+        with patch.object(finder, '_compute_storage_root', return_value=tmp_path) as compute:
+            assert finder.get_storage_root() == tmp_path
+            assert finder.get_storage_root() == tmp_path
+            assert compute.call_count == 1
+    
+    def test_get_storage_root_missing_not_cached(self):
+        """Test that a missing storage root is looked up again on the next call."""
+        finder = CopilotChatFinder()
+        with patch('platform.system', return_value='Linux'), \
+             patch('pathlib.Path.home', return_value=pathlib.Path("/home/test")), \
+             patch.object(finder, '_compute_storage_root', return_value=None) as compute:
+            expected = pathlib.Path("/home/test/.config/Code/User/workspaceStorage")
+            assert finder.get_storage_root() == expected
+            assert finder.get_storage_root() == expected
+            assert compute.call_count == 2
+    
+    def test_get_storage_root_checks_each_candidate_once(self):
+        """Test that resolving the storage root stats each candidate only once."""
+        finder = CopilotChatFinder()
+        checked = []
+        def mock_exists(self):
+            checked.append(self)
+            return "Code - Insiders" in str(self)
+        
+        with patch('platform.system', return_value='Linux'), \
+             patch('pathlib.Path.home', return_value=pathlib.Path("/home/test")), \
+             patch.object(pathlib.Path, 'exists', mock_exists):
+            root = finder.get_storage_root()
+            assert finder.get_storage_root() == root
+        assert len(checked) == len(set(checked)) == 2
+    
     def test_find_all_chat_files_no_storage(self):
         """Test finding chat files when storage doesn't exist."""
         finder = CopilotChatFinder()
@@ -85,24 +134,58 @@ class TestCopilotChatFinder:
                 result = finder.find_all_chat_files()
                 assert result == []
     
-    def test_find_all_chat_files_with_chats(self):
+    def test_find_all_chat_files_with_chats(self, chat_ws):
         """Test finding chat files in workspace storage."""
         finder = CopilotChatFinder()
-        with tempfile.TemporaryDirectory() as tmpdir:
-            storage_path = pathlib.Path(tmpdir)
-            workspace_dir = storage_path / "workspace1"
-            workspace_dir.mkdir()
-            chat_dir = workspace_dir / "chatSessions"
-            chat_dir.mkdir()
-            
-            # Create a chat JSON file
-            chat_file = chat_dir / "chat1.json"
-            chat_file.write_text('{"sessionId": "123", "customTitle": "Test Chat"}')
-            
-            with patch.object(finder, 'get_storage_root', return_value=storage_path):
-                result = finder.find_all_chat_files()
-                assert len(result) == 1
-                assert result[0].name == "chat1.json"
+        storage_path, _, make_chat = chat_ws
+        
+        # Create a chat JSON file
+        make_chat("chat1.json", _chat_bytes("123"))
+        
+        with patch.object(finder, 'get_storage_root', return_value=storage_path):
+            result = finder.find_all_chat_files()
+            assert len(result) == 1
+            assert result[0].name == "chat1.json"
+    
+    def test_find_all_chat_files_extension_case_insensitive(self, chat_ws):
+        """Test that chat files match the .json extension in any case."""
+        finder = CopilotChatFinder()
+        storage_path, _, make_chat = chat_ws
+        make_chat("CHAT.JSON", _chat_bytes("123"))
+        make_chat("notes.txt", b"")
+        
+        with patch.object(finder, 'get_storage_root', return_value=storage_path):
+            result = finder.find_all_chat_files()
+        assert [p.name for p in result] == ["CHAT.JSON"]
+    
+    def test_find_all_chat_files_skips_unreadable_workspace(self, chat_ws, monkeypatch):
+        """Test that an unreadable chatSessions dir is skipped rather than aborting the listing."""
+        finder = CopilotChatFinder()
+        storage_path, _, make_chat = chat_ws
+        make_chat("chat1.json", _chat_bytes("123"))
+        locked_dir = storage_path / "workspace2" / "chatSessions"
+        locked_dir.mkdir(parents=True)
+        
+        real_scandir = os.scandir
+        def scandir(path):
+            if os.fspath(path) == str(locked_dir):
+                raise PermissionError(path)
+            return real_scandir(path)
+        monkeypatch.setattr(os, "scandir", scandir)
+        
+        with patch.object(finder, 'get_storage_root', return_value=storage_path):
+            result = finder.find_all_chat_files()
+        assert [p.name for p in result] == ["chat1.json"]
+    
+    def test_find_all_chat_files_unreadable_storage(self, tmp_path, monkeypatch):
+        """Test that an unreadable storage root yields no chat files."""
+        finder = CopilotChatFinder()
+        def scandir(path):
+            raise PermissionError(path)
+        monkeypatch.setattr(os, "scandir", scandir)
+        
+        with patch.object(finder, 'get_storage_root', return_value=tmp_path):
+            assert finder.find_all_chat_files() == []
     
     def test_timestamp_ms_to_iso(self):
         """Test converting milliseconds timestamp to ISO format."""
@@ -112,6 +195,17 @@ class TestCopilotChatFinder:
         assert result.endswith('Z')
         assert '2021-01-01' in result
     
+    @pytest.mark.parametrize("timestamp_ms,expected", [
+        (1609459200000, "2021-01-01T00:00:00.000000Z"),
+        (1609459200123, "2021-01-01T00:00:00.123000Z"),
+        (1609459200123.456, "2021-01-01T00:00:00.123456Z"),
+        (1609459200999.9996, "2021-01-01T00:00:01.000000Z"),
+    ])
+    def test_timestamp_ms_to_iso_precision(self, timestamp_ms, expected):
+        """Test that int and fractional float timestamps keep microsecond precision."""
+        finder = CopilotChatFinder()
+        assert finder._timestamp_ms_to_iso(timestamp_ms) == expected
+    
     def test_timestamp_ms_to_iso_none(self):
         """Test converting None timestamp to ISO format."""
         finder = CopilotChatFinder()
@@ -180,60 +274,41 @@ class TestCopilotChatFinder:
         result = finder._extract_text_from_value({})
         assert result == ""
     
-    def test_extract_workspace_path_from_json_file_url(self):
+    def test_extract_workspace_path_from_json_file_url(self, tmp_path):
         """Test extracting workspace path from JSON with file:// URL."""
         finder = CopilotChatFinder()
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            json_data = {"folder": "file:///C:/Users/test/project"}
-            json.dump(json_data, f)
-            f.flush()
-            f.close()
-            
-            result = finder._extract_workspace_path_from_json(pathlib.Path(f.name))
-            assert result == "/C:/Users/test/project"
-            
-            pathlib.Path(f.name).unlink()
+        ws_json = tmp_path / "workspace.json"
+        ws_json.write_bytes(json.dumps({"folder": "file:///C:/Users/test/project"}).encode("utf-8"))
+        
+        result = finder._extract_workspace_path_from_json(ws_json)
+        assert result == "/C:/Users/test/project"
     
-    def test_extract_workspace_path_from_json_plain_path(self):
+    def test_extract_workspace_path_from_json_plain_path(self, tmp_path):
         """Test extracting workspace path from JSON with plain path."""
         finder = CopilotChatFinder()
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            json_data = {"folder": "C:/Users/test/project"}
-            json.dump(json_data, f)
-            f.flush()
-            f.close()
-            
-            result = finder._extract_workspace_path_from_json(pathlib.Path(f.name))
-            assert result == "C:/Users/test/project"
-            
-            pathlib.Path(f.name).unlink()
+        ws_json = tmp_path / "workspace.json"
+        ws_json.write_bytes(json.dumps({"folder": "C:/Users/test/project"}).encode("utf-8"))
+        
+        result = finder._extract_workspace_path_from_json(ws_json)
+        assert result == "C:/Users/test/project"
     
-    def test_extract_workspace_path_from_json_nested(self):
+    def test_extract_workspace_path_from_json_nested(self, tmp_path):
         """Test extracting workspace path from nested JSON structure."""
         finder = CopilotChatFinder()
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            json_data = {"config": {"workspace": {"path": "file:///home/user/project"}}}
-            json.dump(json_data, f)
-            f.flush()
-            f.close()
-            
-            result = finder._extract_workspace_path_from_json(pathlib.Path(f.name))
-            assert result == "/home/user/project"
-            
-            pathlib.Path(f.name).unlink()
+        ws_json = tmp_path / "workspace.json"
+        ws_json.write_bytes(json.dumps({"config": {"workspace": {"path": "file:///home/user/project"}}}).encode("utf-8"))
+        
+        result = finder._extract_workspace_path_from_json(ws_json)
+        assert result == "/home/user/project"
     
-    def test_extract_workspace_path_from_json_invalid(self):
+    def test_extract_workspace_path_from_json_invalid(self, tmp_path):
         """Test extracting workspace path from invalid JSON."""
         finder = CopilotChatFinder()
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            f.write("invalid json")
-            f.flush()
-            f.close()
-            
-            result = finder._extract_workspace_path_from_json(pathlib.Path(f.name))
-            assert result is None
-            
-            pathlib.Path(f.name).unlink()
+        ws_json = tmp_path / "workspace.json"
+        ws_json.write_bytes(b"invalid json")
+        
+        result = finder._extract_workspace_path_from_json(ws_json)
+        assert result is None
     
     def test_extract_project_name(self):
         """Test extracting project name from workspace."""
@@ -244,8 +319,7 @@ class TestCopilotChatFinder:
             workspace_dir.mkdir()
             workspace_json = workspace_dir / "workspace.json"
             
-            json_data = {"folder": "file:///C:/Users/test/myproject"}
-            json.dump(json_data, workspace_json.open('w'))
+            workspace_json.write_bytes(json.dumps({"folder": "file:///C:/Users/test/myproject"}).encode("utf-8"))
             
             result = finder._extract_project_name("workspace123", storage_path)
             assert result == "myproject"
@@ -261,75 +335,45 @@ class TestCopilotChatFinder:
             result = finder._extract_project_name("workspace123", storage_path)
             assert result == "Unknown Project"
     
-    def test_extract_metadata_lightweight_with_file(self):
+    def test_extract_metadata_lightweight_with_file(self, chat_ws):
         """Test extracting metadata from actual chat file."""
         finder = CopilotChatFinder()
-        with tempfile.TemporaryDirectory() as tmpdir:
-            storage_path = pathlib.Path(tmpdir)
-            workspace_dir = storage_path / "workspace1"
-            workspace_dir.mkdir()
-            chat_dir = workspace_dir / "chatSessions"
-            chat_dir.mkdir()
-            
-            # Create a chat JSON file
-            chat_file = chat_dir / "chat1.json"
-            chat_data = {
-                "sessionId": "12345",
-                "customTitle": "Test Chat",
-                "creationDate": 1609459200000  # 2021-01-01
-            }
-            json.dump(chat_data, chat_file.open('w'))
-            
-            result = finder._extract_metadata_lightweight(chat_file)
-            assert result is not None
-            assert result["title"] == "Test Chat"
-            assert "2021-01-01" in result["date"]
-            assert "id" in result
+        _, _, make_chat = chat_ws
+        
+        # Create a chat JSON file
+        chat_file = make_chat("chat1.json", _chat_bytes())
+        
+        result = finder._extract_metadata_lightweight(chat_file)
+        assert result is not None
+        assert result["title"] == "Test Chat"
+        assert "2021-01-01" in result["date"]
+        assert "id" in result
     
-    def test_parse_chat_full(self):
+    def test_parse_chat_full(self, chat_ws):
         """Test parsing full chat content."""
         finder = CopilotChatFinder()
-        with tempfile.TemporaryDirectory() as tmpdir:
-            storage_path = pathlib.Path(tmpdir)
-            workspace_dir = storage_path / "workspace1"
-            workspace_dir.mkdir()
-            chat_dir = workspace_dir / "chatSessions"
-            chat_dir.mkdir()
-            
-            # Create a minimal chat JSON file
-            chat_file = chat_dir / "chat1.json"
-            chat_data = {
-                "sessionId": "12345",
-                "customTitle": "Test Chat",
-                "creationDate": 1609459200000,
-                "requests": [{
-                    "message": {"text": "Hello"},
-                    "response": [{"value": "Hi there"}]
-                }]
-            }
-            json.dump(chat_data, chat_file.open('w'))
-            
-            with patch.object(finder, 'get_storage_root', return_value=storage_path):
-                result = finder._parse_chat_full(chat_file)
-                # Should return a dict with messages
-                assert result is not None
-                assert isinstance(result, dict)
-                assert "messages" in result
-                assert len(result["messages"]) > 0
-    
-    def test_parse_chat_full_no_storage(self):
+        storage_path, _, make_chat = chat_ws
+        
+        # Create a minimal chat JSON file
+        chat_file = make_chat("chat1.json", _chat_bytes())
+        
+        with patch.object(finder, 'get_storage_root', return_value=storage_path):
+            result = finder._parse_chat_full(chat_file)
+            # Should return a dict with messages
+            assert result is not None
+            assert isinstance(result, dict)
+            assert "messages" in result
+            assert len(result["messages"]) > 0
+    
+    def test_parse_chat_full_no_storage(self, tmp_path):
         """Test parsing chat when storage root is None."""
         finder = CopilotChatFinder()
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            json.dump({"sessionId": "123"}, f)
-            f.flush()
-            f.close()
-            
-            with patch.object(finder, 'get_storage_root', return_value=None):
-                result = finder._parse_chat_full(pathlib.Path(f.name))
-                assert result is None
-            
-            pathlib.Path(f.name).unlink()
+        chat_file = tmp_path / "chat.json"
+        chat_file.write_bytes(json.dumps({"sessionId": "123"}).encode("utf-8"))
+        
+        with patch.object(finder, 'get_storage_root', return_value=None):
+            result = finder._parse_chat_full(chat_file)
+            assert result is None
     
     def test_parse_chat_full_invalid_path(self):
         """Test parsing chat with invalid path."""
@@ -337,49 +381,45 @@ class TestCopilotChatFinder:
         result = finder._parse_chat_full("not_a_path")
         assert result is None
     
-    def test_extract_metadata_lightweight(self):
+    def test_extract_metadata_lightweight(self, chat_ws):
         """Test extracting metadata from chat file."""
         finder = CopilotChatFinder()
-        with tempfile.TemporaryDirectory() as tmpdir:
-            storage_path = pathlib.Path(tmpdir)
-            workspace_dir = storage_path / "workspace1"
-            workspace_dir.mkdir()
-            chat_dir = workspace_dir / "chatSessions"
-            chat_dir.mkdir()
-            
-            chat_file = chat_dir / "chat1.json"
-            chat_data = {
-                "sessionId": "12345",
-                "customTitle": "Test Chat",
-                "creationDate": 1609459200000
-            }
-            json.dump(chat_data, chat_file.open('w'))
-            
-            result = finder._extract_metadata_lightweight(chat_file)
-            assert result is not None
-            assert result["title"] == "Test Chat"
-            assert "2021-01-01" in result["date"]
+        _, _, make_chat = chat_ws
+        
+        chat_file = make_chat("chat1.json", _chat_bytes())
+        
+        result = finder._extract_metadata_lightweight(chat_file)
+        assert result is not None
+        assert result["title"] == "Test Chat"
+        assert "2021-01-01" in result["date"]
     
-    def test_extract_metadata_lightweight_no_title(self):
+    def test_extract_metadata_lightweight_truncated_file(self, chat_ws):
+        """Test that a truncated chat file is not listed even if its metadata is intact."""
+        finder = CopilotChatFinder()
+        _, _, make_chat = chat_ws
+        
+        data = _chat_bytes()
+        chat_file = make_chat("chat1.json", data[:len(data) - 10])
+        
+        assert finder._extract_metadata_lightweight(chat_file) is None
+    
+    @pytest.mark.parametrize("chat_data", [
+        pytest.param(
+            json.dumps({"sessionId": "12345678", "creationDate": 1609459200000, "requests": []}).encode("utf-8"),
+            id="missing_key",
+        ),
+        pytest.param(_chat_bytes("12345678", title=""), id="empty_string"),
+    ])
+    def test_extract_metadata_lightweight_no_title(self, chat_ws, chat_data):
         """Test extracting metadata when no custom title."""
         finder = CopilotChatFinder()
-        with tempfile.TemporaryDirectory() as tmpdir:
-            storage_path = pathlib.Path(tmpdir)
-            workspace_dir = storage_path / "workspace1"
-            workspace_dir.mkdir()
-            chat_dir = workspace_dir / "chatSessions"
-            chat_dir.mkdir()
-            
-            chat_file = chat_dir / "chat1.json"
-            chat_data = {
-                "sessionId": "12345678",
-                "creationDate": 1609459200000
-            }
-            json.dump(chat_data, chat_file.open('w'))
-            
-            result = finder._extract_metadata_lightweight(chat_file)
-            assert result is not None
-            assert "Chat 12345678" in result["title"]
+        _, _, make_chat = chat_ws
+        
+        chat_file = make_chat("chat1.json", chat_data)
+        
+        result = finder._extract_metadata_lightweight(chat_file)
+        assert result is not None
+        assert "Chat 12345678" in result["title"]
     
     def test_transform_chat_to_new_format(self):
         """Test transforming chat to new format."""
@@ -400,7 +440,7 @@ class TestCopilotChatFinder:
             workspace_dir = storage_path / "workspace1"
             workspace_dir.mkdir()
             workspace_json = workspace_dir / "workspace.json"
-            json.dump({"folder": "file:///C:/Users/test/myproject"}, workspace_json.open('w'))
+            workspace_json.write_bytes(json.dumps({"folder": "file:///C:/Users/test/myproject"}).encode("utf-8"))
             
             result = finder._transform_chat_to_new_format(raw_data, "workspace1", storage_path)
             assert result is not None
@@ -409,6 +449,34 @@ class TestCopilotChatFinder:
             assert len(result["messages"]) > 0
             assert result["metadata"]["Project"] == "myproject"
     
+    def test_transform_chat_messages_inputs_only_when_present(self, tmp_path):
+        """Test that transformed messages are plain dicts with inputs only for attachments."""
+        finder = CopilotChatFinder()
+        raw_data = {
+            "sessionId": "12345",
+            "creationDate": 1609459200000,
+            "requests": [
+                {
+                    "message": {"text": "With file"},
+                    "variableData": {"variables": [
+                        {"kind": "file", "value": {"fsPath": "/path/to/file.py"}}
+                    ]},
+                },
+                {"message": {"text": "Without file"}},
+            ]
+        }
+        
+        result = finder._transform_chat_to_new_format(raw_data, "workspace1", tmp_path)
+        with_file, without_file = result["messages"]
+        assert with_file == {
+            "role": "user",
+            "type": "text",
+            "content": "With file",
+            "timestamp": with_file["timestamp"],
+            "inputs": {"attachment": "/path/to/file.py"},
+        }
+        assert "inputs" not in without_file
+    
     def test_transform_chat_to_new_format_no_messages(self):
         """Test transforming chat with no messages."""
         finder = CopilotChatFinder()
@@ -451,7 +519,7 @@ class TestCopilotChatFinder:
             result = finder._transform_chat_to_new_format(raw_data, "workspace1", storage_path)
             assert result is not None
             # Should have tool message for code block
-            tool_messages = [m for m in result["messages"] if m.get("type") == "tool"]
+            tool_messages = group_messages_by_type(result["messages"]).get("tool", [])
             assert len(tool_messages) > 0
     
     def test_transform_chat_to_new_format_with_tool_invocation(self):
@@ -478,7 +546,7 @@ class TestCopilotChatFinder:
             
             result = finder._transform_chat_to_new_format(raw_data, "workspace1", storage_path)
             assert result is not None
-            tool_messages = [m for m in result["messages"] if m.get("type") == "tool"]
+            tool_messages = group_messages_by_type(result["messages"]).get("tool", [])
             assert len(tool_messages) > 0
             assert tool_messages[0]["content"]["tool_name"] == "read"
     
@@ -525,51 +593,50 @@ class TestCopilotChatFinder:
         result = finder._convert_inline_reference_to_markdown(inline_ref)
         assert result == "`/path/to/file.py`"
     
-    def test_export_chats(self):
+    def test_export_chats(self, chat_ws):
         """Test exporting all chats."""
         finder = CopilotChatFinder()
-        with tempfile.TemporaryDirectory() as tmpdir:
-            storage_path = pathlib.Path(tmpdir)
-            workspace_dir = storage_path / "workspace1"
-            workspace_dir.mkdir()
-            chat_dir = workspace_dir / "chatSessions"
-            chat_dir.mkdir()
-            
-            chat_file = chat_dir / "chat1.json"
-            chat_data = {
-                "sessionId": "12345",
-                "customTitle": "Test Chat",
-                "creationDate": 1609459200000,
-                "requests": [{
-                    "message": {"text": "Hello"},
-                    "response": [{"value": "Hi"}]
-                }]
-            }
-            json.dump(chat_data, chat_file.open('w'))
-            
-            output_path = pathlib.Path(tmpdir) / "output.json"
-            
-            with patch.object(finder, 'get_storage_root', return_value=storage_path):
-                result = finder.export_chats(output_path)
-                assert len(result) == 1
-                assert output_path.exists()
-                data = json.loads(output_path.read_text())
-                assert len(data) == 1
-    
-    def test_export_chats_empty(self):
+        storage_path, _, make_chat = chat_ws
+        
+        make_chat("chat1.json", _chat_bytes())
+        
+        output_path = storage_path / "output.json"
+        
+        with patch.object(finder, 'get_storage_root', return_value=storage_path):
+            result = finder.export_chats(output_path)
+            assert len(result) == 1
+            assert output_path.exists()
+            data = json.loads(output_path.read_text())
+            assert len(data) == 1
+    
+    def test_export_chats_empty(self, tmp_path):
         """Test exporting chats when no files found."""
         finder = CopilotChatFinder()
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            f.close()
-            output_path = pathlib.Path(f.name)
-            
-            with patch.object(finder, 'find_all_chat_files', return_value=[]), \
-                 patch.object(finder, 'get_storage_root', return_value=None):
-                result = finder.export_chats(output_path)
-                assert result == []
-                assert output_path.exists()
-            
-            output_path.unlink()
+        output_path = tmp_path / "output.json"
+        
+        with patch.object(finder, 'find_all_chat_files', return_value=[]), \
+             patch.object(finder, 'get_storage_root', return_value=None):
+            result = finder.export_chats(output_path)
+            assert result == []
+            assert output_path.exists()
+    
+    @pytest.mark.parametrize("odd_value", [
+        pytest.param({"size": 2 ** 70}, id="int_beyond_64_bits"),
+        pytest.param({1: "non-str key"}, id="non_str_key"),
+    ])
+    def test_export_chats_values_orjson_rejects(self, tmp_path, odd_value):
+        """Test that values orjson cannot encode natively still export like json.dump."""
+        finder = CopilotChatFinder()
+        output_path = tmp_path / "output.json"
+        chat = {"title": "Odd", "messages": [], "metadata": odd_value}
+        
+        with patch.object(finder, 'find_all_chat_files', return_value=[tmp_path / "chat.json"]), \
+             patch.object(finder, 'get_storage_root', return_value=tmp_path), \
+             patch.object(finder, '_transform_chat_file', return_value=chat):
+            result = finder.export_chats(output_path)
+        
+        assert result == [chat]
+        assert json.loads(output_path.read_text(encoding="utf-8")) == json.loads(json.dumps([chat]))
     
     def test_extract_tool_input_with_result_details(self):
         """Test extracting tool input from resultDetails."""
@@ -654,29 +721,23 @@ class TestCopilotChatFinder:
             result = finder._transform_chat_to_new_format(raw_data, "workspace1", storage_path)
             assert result is not None
             # Should combine text and inline reference
-            text_messages = [m for m in result["messages"] if m.get("type") == "text"]
+            text_messages = group_messages_by_type(result["messages"]).get("text", [])
             assert len(text_messages) > 0
             # Check that inline reference is included in the message
             content = text_messages[0]["content"]
             assert "/path/to/file.py" in content or "`/path/to/file.py`" in content or "file.py" in content
     
-    def test_export_chats_skip_invalid_files(self):
+    def test_export_chats_skip_invalid_files(self, chat_ws):
         """Test that export_chats skips files that can't be parsed."""
         finder = CopilotChatFinder()
-        with tempfile.TemporaryDirectory() as tmpdir:
-            storage_path = pathlib.Path(tmpdir)
-            workspace_dir = storage_path / "workspace1"
-            workspace_dir.mkdir()
-            chat_dir = workspace_dir / "chatSessions"
-            chat_dir.mkdir()
-            
-            chat_file = chat_dir / "chat1.json"
-            chat_file.write_text('invalid json')
-            
-            output_path = pathlib.Path(tmpdir) / "output.json"
-            
-            with patch.object(finder, 'get_storage_root', return_value=storage_path):
-                result = finder.export_chats(output_path)
-                # Should skip invalid file
-                assert len(result) == 0
+        storage_path, _, make_chat = chat_ws
+        
+        make_chat("chat1.json", "invalid json")
+        
+        output_path = storage_path / "output.json"
+        
+        with patch.object(finder, 'get_storage_root', return_value=storage_path):
+            result = finder.export_chats(output_path)
+            # Should skip invalid file
+            assert len(result) == 0
 
@@ -6,134 +6,190 @@ Unit tests for CursorChatFinder.
 import pytest
 import json
 import pathlib
-import tempfile
+import shutil
 import sqlite3
+from contextlib import closing
 import platform
-from unittest.mock import Mock, patch, MagicMock
 from src.domain.cursor_chats_finder import CursorChatFinder
 
 
+def _fast_sqlite_connect(db_path):
+    """Connect to a throwaway test database without journaling to disk or fsync."""
+    con = sqlite3.connect(str(db_path))
+    con.executescript("PRAGMA journal_mode=MEMORY; PRAGMA synchronous=OFF; PRAGMA temp_store=MEMORY;")
+    return con
+
+
+def _create_kv_db(db_path, table):
+    """Create a Cursor-style key/value database with a single empty table."""
+    with closing(_fast_sqlite_connect(db_path)) as con:
+        con.execute(f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT)")
+        con.commit()
+
+
+# Constant fixture payloads, serialized once at import rather than per test.
+_WS_COMPOSER_JSON = json.dumps({
+    "allComposers": [{
+        "composerId": "test_composer_123",
+        "name": "Test Chat Title",
+        "createdAt": 1609459200000  # milliseconds
+    }]
+})
+_GLOBAL_COMPOSER_JSON = json.dumps({
+    "name": "Global Chat Title",
+    "createdAt": 1609459200  # seconds
+})
+_WS_CHAT_JSON = json.dumps({
+    "tabs": [{
+        "tabId": "test_composer_123",
+        "bubbles": [
+            {"type": 1, "text": "Hello", "createdAt": 1609459200000},
+            {"type": 2, "text": "Hi there", "createdAt": 1609459201000}
+        ]
+    }]
+})
+_GLOBAL_BUBBLE_JSON = json.dumps({
+    "type": 1,
+    "text": "Hello from global",
+    "createdAt": 1609459200000
+})
+
+
+def _insert_json(db_path, table, *rows):
+    """Insert (key, json_text) rows in a single transaction."""
+    with closing(_fast_sqlite_connect(db_path)) as con:
+        con.executemany(f"INSERT INTO {table} (key, value) VALUES (?, ?)", rows)
+        con.commit()
+
+
+@pytest.fixture(scope="session")
+def workspace_db_template(tmp_path_factory):
+    """Workspace state.vscdb with an empty ItemTable, created once per session."""
+    db_path = tmp_path_factory.mktemp("templates") / "workspace.vscdb"
+    _create_kv_db(db_path, "ItemTable")
+    return db_path
+
+
+@pytest.fixture(scope="session")
+def global_db_template(tmp_path_factory):
+    """Global state.vscdb with an empty cursorDiskKV table, created once per session."""
+    db_path = tmp_path_factory.mktemp("templates") / "global.vscdb"
+    _create_kv_db(db_path, "cursorDiskKV")
+    return db_path
+
+
+@pytest.fixture
+def workspace_db(tmp_path, workspace_db_template):
+    """Fresh copy of the workspace database template."""
+    db_path = tmp_path / "state.vscdb"
+    shutil.copy(workspace_db_template, db_path)
+    return db_path
+
+
+@pytest.fixture
+def global_db(tmp_path, global_db_template):
+    """Fresh copy of the global database template."""
+    db_path = tmp_path / "state.vscdb"
+    shutil.copy(global_db_template, db_path)
+    return db_path
+
+
+@pytest.fixture(scope="session")
+def cursor_storage_template(tmp_path_factory, workspace_db_template, global_db_template):
+    """Cursor storage root with one seeded workspace and global database, built once per session."""
+    root = tmp_path_factory.mktemp("cursor_root")
+    workspace_db = root / "User" / "workspaceStorage" / "workspace1" / "state.vscdb"
+    global_db = root / "User" / "globalStorage" / "state.vscdb"
+    workspace_db.parent.mkdir(parents=True)
+    global_db.parent.mkdir(parents=True)
+    shutil.copy(workspace_db_template, workspace_db)
+    shutil.copy(global_db_template, global_db)
+    _insert_json(workspace_db, "ItemTable", ("composer.composerData", _WS_COMPOSER_JSON))
+    _insert_json(global_db, "cursorDiskKV", ("composerData:global_composer_123", _GLOBAL_COMPOSER_JSON))
+    return root
+
+
+@pytest.fixture
+def cursor_storage(tmp_path, cursor_storage_template):
+    """Fresh copy of the Cursor storage root template."""
+    root = tmp_path / "cursor"
+    shutil.copytree(cursor_storage_template, root)
+    return root
+
+
+@pytest.fixture(scope="module")
+def finder():
+    """Shared CursorChatFinder; the finder keeps no per-call state."""
+    return CursorChatFinder()
+
+
 class TestCursorChatFinder:
     """Test cases for CursorChatFinder."""
     
-    def test_init(self):
+    def test_init(self, finder):
         """Test CursorChatFinder initialization."""
-        finder = CursorChatFinder()
         assert finder._finder_type == "cursor"
         assert isinstance(finder, CursorChatFinder)
     
-    def test_get_storage_root_windows(self):
-        """Test getting Cursor storage root on Windows."""
-        finder = CursorChatFinder()
-        with patch('platform.system', return_value='Windows'), \
-             patch('pathlib.Path.home', return_value=pathlib.Path("C:/Users/test")):
-            result = finder.get_storage_root()
-            expected = pathlib.Path("C:/Users/test/AppData/Roaming/Cursor")
-            assert result == expected
-    
-    def test_get_storage_root_darwin(self):
-        """Test getting Cursor storage root on macOS."""
-        finder = CursorChatFinder()
-        with patch('platform.system', return_value='Darwin'), \
-             patch('pathlib.Path.home', return_value=pathlib.Path("/Users/test")):
-            result = finder.get_storage_root()
-            expected = pathlib.Path("/Users/test/Library/Application Support/Cursor")
-            assert result == expected
-    
-    def test_get_storage_root_linux(self):
-        """Test getting Cursor storage root on Linux."""
-        finder = CursorChatFinder()
-        with patch('platform.system', return_value='Linux'), \
-             patch('pathlib.Path.home', return_value=pathlib.Path("/home/test")):
-            result = finder.get_storage_root()
-            expected = pathlib.Path("/home/test/.config/Cursor")
-            assert result == expected
+    @pytest.mark.parametrize("system,home,expected", [
+        ("Windows", "C:/Users/test", "C:/Users/test/AppData/Roaming/Cursor"),
+        ("Darwin", "/Users/test", "/Users/test/Library/Application Support/Cursor"),
+        ("Linux", "/home/test", "/home/test/.config/Cursor"),
+        ("Unknown", "/home/test", None),
+    ])
+    def test_get_storage_root(self, finder, monkeypatch, system, home, expected):
+        """Test getting Cursor storage root on each supported platform."""
+        monkeypatch.setattr(platform, "system", lambda: system)
+        monkeypatch.setattr(pathlib.Path, "home", lambda: pathlib.Path(home))
+        result = finder.get_storage_root()
+        assert result == (pathlib.Path(expected) if expected else None)
     
-    def test_get_storage_root_unsupported(self):
-        """Test getting storage root on unsupported platform."""
-        finder = CursorChatFinder()
-        with patch('platform.system', return_value='Unknown'):
-            result = finder.get_storage_root()
-            assert result is None
-    
-    def test_find_all_chat_files(self):
+    def test_find_all_chat_files(self, finder):
         """Test that find_all_chat_files returns a list."""
-        finder = CursorChatFinder()
         result = finder.find_all_chat_files()
         assert isinstance(result, list)
         # May be empty if no chats found, or contain items if chats exist
     
-    def test_generate_chat_id(self):
-        """Test that _generate_chat_id generates a unique ID."""
-        finder = CursorChatFinder()
-        test_tuple = ("test_composer_id", "/test/db.vscdb", "workspace_id")
-        result = finder._generate_chat_id(test_tuple)
-        assert isinstance(result, str)
-        # Should be deterministic
-        result2 = finder._generate_chat_id(test_tuple)
-        assert result == result2
-        # Invalid input should return empty string
-        result3 = finder._generate_chat_id("not_a_tuple")
-        assert result3 == ""
-    
-    def test_extract_metadata_lightweight_not_implemented(self):
-        """Test that _extract_metadata_lightweight is not yet implemented."""
-        finder = CursorChatFinder()
-        result = finder._extract_metadata_lightweight("test_composer_id")
-        assert result is None
-    
-    def test_parse_chat_full_not_implemented(self):
-        """Test that _parse_chat_full is not yet implemented."""
-        finder = CursorChatFinder()
-        result = finder._parse_chat_full("test_composer_id")
-        assert result is None
+    @pytest.mark.parametrize("method,key", [
+        ("_generate_unique_id", "test_composer_123"),
+        ("_generate_unique_id", "composer_abc"),
+        ("_generate_chat_id", ("test_composer_id", "/test/db.vscdb", "workspace_id")),
+    ])
+    def test_generate_id_deterministic(self, finder, method, key):
+        """Test that ID generation yields a stable 16-character hex string."""
+        generate = getattr(finder, method)
+        chat_id = generate(key)
+        assert isinstance(chat_id, str)
+        assert len(chat_id) == 16
+        assert generate(key) == chat_id
     
-    def test_get_chat_metadata_list(self):
+    def test_get_chat_metadata_list(self, finder):
         """Test that get_chat_metadata_list returns a list."""
-        finder = CursorChatFinder()
         result = finder.get_chat_metadata_list()
         assert isinstance(result, list)
         # May be empty if no chats found, or contain items if chats exist
     
-    def test_parse_chat_by_id_not_found(self):
+    def test_parse_chat_by_id_not_found(self, finder):
         """Test that parse_chat_by_id raises ValueError for non-existent chat."""
-        finder = CursorChatFinder()
-        with pytest.raises(ValueError, match="Chat ID 'test_id' not found"):
+        with pytest.raises(ValueError) as ei:
             finder.parse_chat_by_id("test_id")
+        assert "Chat ID 'test_id' not found" in str(ei.value)
     
-    def test_extract_chats_not_implemented(self):
-        """Test that extract_chats is not yet implemented."""
-        finder = CursorChatFinder()
-        result = finder.extract_chats()
-        assert result is None
-    
-    def test_export_chats_to_json_not_implemented(self):
-        """Test that export_chats_to_json is not yet implemented."""
-        finder = CursorChatFinder()
-        result = finder.export_chats_to_json()
-        assert result is None
+    @pytest.mark.parametrize("method,args", [
+        ("extract_chats", ()),
+        ("export_chats_to_json", ()),
+    ])
+    def test_unimplemented_returns_none(self, finder, method, args):
+        """Test that the still-stubbed finder entry points return None."""
+        assert getattr(finder, method)(*args) is None
     
-    def test_get_timezone_offset(self):
+    def test_get_timezone_offset(self, finder):
         """Test timezone offset from base class."""
-        finder = CursorChatFinder()
         offset = finder._get_timezone_offset()
         assert offset.startswith("UTC")
     
-    def test_generate_unique_id(self):
-        """Test unique ID generation from base class."""
-        finder = CursorChatFinder()
-        unique_key = "test_composer_123"
-        chat_id = finder._generate_unique_id(unique_key)
-        
-        assert len(chat_id) == 16
-        assert isinstance(chat_id, str)
-        # Should be deterministic
-        chat_id2 = finder._generate_unique_id(unique_key)
-        assert chat_id == chat_id2
-    
-    def test_generate_chat_id_invalid_input(self):
+    def test_generate_chat_id_invalid_input(self, finder):
         """Test _generate_chat_id with various invalid inputs."""
-        finder = CursorChatFinder()
         # Not a tuple
         assert finder._generate_chat_id("not_a_tuple") == ""
         # Too short tuple
@@ -141,9 +197,8 @@ class TestCursorChatFinder:
         # Empty tuple
         assert finder._generate_chat_id(()) == ""
     
-    def test_extract_metadata_lightweight_invalid_input(self):
+    def test_extract_metadata_lightweight_invalid_input(self, finder):
         """Test _extract_metadata_lightweight with invalid inputs."""
-        finder = CursorChatFinder()
         # Not a tuple
         assert finder._extract_metadata_lightweight("not_a_tuple") is None
         # Too short tuple
@@ -152,9 +207,8 @@ class TestCursorChatFinder:
         result = finder._extract_metadata_lightweight(("composer_id", "/nonexistent/path.db", "workspace"))
         assert result is None
     
-    def test_parse_chat_full_invalid_input(self):
+    def test_parse_chat_full_invalid_input(self, finder):
         """Test _parse_chat_full with invalid inputs."""
-        finder = CursorChatFinder()
         # Not a tuple
         assert finder._parse_chat_full("not_a_tuple") is None
         # Too short tuple
@@ -163,229 +217,71 @@ class TestCursorChatFinder:
         result = finder._parse_chat_full(("composer_id", "/nonexistent/path.db", "workspace"))
         assert result is None
     
-    def test_get_storage_root_returns_none_for_unsupported_platform(self):
-        """Test that get_storage_root returns None for unsupported platform."""
-        finder = CursorChatFinder()
-        with patch('platform.system', return_value='Unknown'):
-            result = finder.get_storage_root()
-            assert result is None
-    
-    def test_extract_metadata_lightweight_with_workspace_db(self):
+    def test_extract_metadata_lightweight_with_workspace_db(self, finder, workspace_db):
         """Test extracting metadata from workspace database."""
-        finder = CursorChatFinder()
-        with tempfile.NamedTemporaryFile(suffix='.vscdb', delete=False) as f:
-            db_path = pathlib.Path(f.name)
-            f.close()
-            
-            # Create a mock database
-            con = sqlite3.connect(str(db_path))
-            cur = con.cursor()
-            cur.execute("CREATE TABLE IF NOT EXISTS ItemTable (key TEXT PRIMARY KEY, value TEXT)")
-            composer_data = {
-                "allComposers": [{
-                    "composerId": "test_composer_123",
-                    "name": "Test Chat Title",
-                    "createdAt": 1609459200000  # milliseconds
-                }]
-            }
-            cur.execute("INSERT INTO ItemTable (key, value) VALUES (?, ?)",
-                       ("composer.composerData", json.dumps(composer_data)))
-            con.commit()
-            con.close()
-            
-            result = finder._extract_metadata_lightweight(("test_composer_123", str(db_path), "workspace1"))
-            assert result is not None
-            assert result["title"] == "Test Chat Title"
-            assert "2021-01-01" in result["date"]
-            assert "id" in result
-            
-            db_path.unlink()
+        _insert_json(workspace_db, "ItemTable", ("composer.composerData", _WS_COMPOSER_JSON))
+        
+        result = finder._extract_metadata_lightweight(("test_composer_123", str(workspace_db), "workspace1"))
+        assert result is not None
+        assert result["title"] == "Test Chat Title"
+        assert "2021-01-01" in result["date"]
+        assert "id" in result
     
-    def test_extract_metadata_lightweight_with_global_db(self):
+    def test_extract_metadata_lightweight_with_global_db(self, finder, global_db):
         """Test extracting metadata from global database."""
-        finder = CursorChatFinder()
-        with tempfile.NamedTemporaryFile(suffix='.vscdb', delete=False) as f:
-            db_path = pathlib.Path(f.name)
-            f.close()
-            
-            # Create a mock database with cursorDiskKV table
-            con = sqlite3.connect(str(db_path))
-            cur = con.cursor()
-            cur.execute("CREATE TABLE IF NOT EXISTS cursorDiskKV (key TEXT PRIMARY KEY, value TEXT)")
-            composer_data = {
-                "name": "Global Chat Title",
-                "createdAt": 1609459200  # seconds
-            }
-            cur.execute("INSERT INTO cursorDiskKV (key, value) VALUES (?, ?)",
-                       ("composerData:test_composer_123", json.dumps(composer_data)))
-            con.commit()
-            con.close()
-            
-            result = finder._extract_metadata_lightweight(("test_composer_123", str(db_path), "(global)"))
-            assert result is not None
-            assert result["title"] == "Global Chat Title"
-            assert "2021-01-01" in result["date"]
-            
-            db_path.unlink()
+        _insert_json(global_db, "cursorDiskKV", ("composerData:test_composer_123", _GLOBAL_COMPOSER_JSON))
+        
+        result = finder._extract_metadata_lightweight(("test_composer_123", str(global_db), "(global)"))
+        assert result is not None
+        assert result["title"] == "Global Chat Title"
+        assert "2021-01-01" in result["date"]
     
-    def test_extract_metadata_lightweight_fallback(self):
+    def test_extract_metadata_lightweight_fallback(self, finder, tmp_path):
         """Test extracting metadata with fallback to default title."""
-        finder = CursorChatFinder()
-        db_path = None
-        try:
-            with tempfile.NamedTemporaryFile(suffix='.vscdb', delete=False) as f:
-                db_path = pathlib.Path(f.name)
-                f.close()
-                
-                # Create empty database
-                con = sqlite3.connect(str(db_path))
-                con.close()
-                
-                result = finder._extract_metadata_lightweight(("test_composer_123", str(db_path), "workspace1"))
-                assert result is not None
-                assert "Chat" in result["title"]  # Title should start with "Chat"
-                assert "date" in result
-        finally:
-            if db_path and db_path.exists():
-                import time
-                time.sleep(0.1)  # Give time for connection to close
-                try:
-                    db_path.unlink()
-                except:
-                    pass
+        db_path = tmp_path / "state.vscdb"
+        
+        # Create empty database
+        with closing(_fast_sqlite_connect(db_path)):
+            pass
+        
+        result = finder._extract_metadata_lightweight(("test_composer_123", str(db_path), "workspace1"))
+        assert result is not None
+        assert "Chat" in result["title"]  # Title should start with "Chat"
+        assert "date" in result
     
-    def test_find_all_chat_files_with_workspace_db(self):
+    def test_find_all_chat_files_with_workspace_db(self, finder, monkeypatch, cursor_storage):
         """Test finding chat files in workspace database."""
-        finder = CursorChatFinder()
-        with tempfile.TemporaryDirectory() as tmpdir:
-            root = pathlib.Path(tmpdir)
-            ws_root = root / "User" / "workspaceStorage"
-            ws_root.mkdir(parents=True)
-            workspace_dir = ws_root / "workspace1"
-            workspace_dir.mkdir()
-            db_path = workspace_dir / "state.vscdb"
-            
-            # Create database with composer data
-            con = sqlite3.connect(str(db_path))
-            cur = con.cursor()
-            cur.execute("CREATE TABLE IF NOT EXISTS ItemTable (key TEXT PRIMARY KEY, value TEXT)")
-            composer_data = {
-                "allComposers": [{"composerId": "composer_123"}]
-            }
-            cur.execute("INSERT INTO ItemTable (key, value) VALUES (?, ?)",
-                       ("composer.composerData", json.dumps(composer_data)))
-            con.commit()
-            con.close()
-            
-            with patch.object(finder, 'get_storage_root', return_value=root):
-                result = finder.find_all_chat_files()
-                assert len(result) > 0
-                assert any(cid == "composer_123" for cid, _, _ in result)
+        monkeypatch.setattr(finder, "get_storage_root", lambda: cursor_storage)
+        result = finder.find_all_chat_files()
+        assert len(result) > 0
+        assert any(cid == "test_composer_123" for cid, _, _ in result)
     
-    @pytest.mark.skip(reason="Database cleanup issues on Windows")
-    def test_find_all_chat_files_with_global_db(self):
+    def test_find_all_chat_files_with_global_db(self, finder, monkeypatch, cursor_storage):
         """Test finding chat files in global database."""
-        finder = CursorChatFinder()
-        global_db = None
-        try:
-            with tempfile.TemporaryDirectory() as tmpdir:
-                root = pathlib.Path(tmpdir)
-                global_db = root / "User" / "globalStorage" / "state.vscdb"
-                global_db.parent.mkdir(parents=True)
-                
-                # Create global database
-                con = sqlite3.connect(str(global_db))
-                cur = con.cursor()
-                cur.execute("CREATE TABLE IF NOT EXISTS cursorDiskKV (key TEXT PRIMARY KEY, value TEXT)")
-                cur.execute("INSERT INTO cursorDiskKV (key, value) VALUES (?, ?)",
-                           ("composerData:global_composer_123", json.dumps({"name": "Test"})))
-                con.commit()
-                con.close()
-                
-                with patch.object(finder, 'get_storage_root', return_value=root), \
-                     patch('cursor_chats_finder.global_storage_path', return_value=global_db):
-                    result = finder.find_all_chat_files()
-                    # Should find the global composer
-                    assert any(cid == "global_composer_123" for cid, _, _ in result)
-        finally:
-            # Explicitly close connection before cleanup
-            if global_db and global_db.exists():
-                import time
-                time.sleep(0.1)  # Give time for connection to close
-                try:
-                    global_db.unlink()
-                except:
-                    pass
+        monkeypatch.setattr(finder, "get_storage_root", lambda: cursor_storage)
+        result = finder.find_all_chat_files()
+        # Should find the global composer
+        assert any(cid == "global_composer_123" for cid, _, _ in result)
     
-    def test_parse_chat_full_with_workspace_db(self):
+    def test_parse_chat_full_with_workspace_db(self, finder, workspace_db):
         """Test parsing full chat from workspace database."""
-        finder = CursorChatFinder()
-        with tempfile.NamedTemporaryFile(suffix='.vscdb', delete=False) as f:
-            db_path = pathlib.Path(f.name)
-            f.close()
-            
-            # Create database with chat data
-            con = sqlite3.connect(str(db_path))
-            cur = con.cursor()
-            cur.execute("CREATE TABLE IF NOT EXISTS ItemTable (key TEXT PRIMARY KEY, value TEXT)")
-            chat_data = {
-                "tabs": [{
-                    "tabId": "test_composer_123",
-                    "bubbles": [
-                        {"type": 1, "text": "Hello", "createdAt": 1609459200000},
-                        {"type": 2, "text": "Hi there", "createdAt": 1609459201000}
-                    ]
-                }]
-            }
-            cur.execute("INSERT INTO ItemTable (key, value) VALUES (?, ?)",
-                       ("workbench.panel.aichat.view.aichat.chatdata", json.dumps(chat_data)))
-            con.commit()
-            con.close()
-            
-            result = finder._parse_chat_full(("test_composer_123", str(db_path), "workspace1"))
-            assert result is not None
-            assert "messages" in result
-            assert len(result["messages"]) > 0
-            
-            db_path.unlink()
+        _insert_json(workspace_db, "ItemTable", ("workbench.panel.aichat.view.aichat.chatdata", _WS_CHAT_JSON))
+        
+        result = finder._parse_chat_full(("test_composer_123", str(workspace_db), "workspace1"))
+        assert result is not None
+        assert "messages" in result
+        assert len(result["messages"]) > 0
     
-    def test_parse_chat_full_with_global_db(self):
+    def test_parse_chat_full_with_global_db(self, finder, global_db):
         """Test parsing full chat from global database."""
-        finder = CursorChatFinder()
-        db_path = None
-        try:
-            with tempfile.NamedTemporaryFile(suffix='.vscdb', delete=False) as f:
-                db_path = pathlib.Path(f.name)
-                f.close()
-                
-                # Create database with bubble data
-                con = sqlite3.connect(str(db_path))
-                cur = con.cursor()
-                cur.execute("CREATE TABLE IF NOT EXISTS cursorDiskKV (key TEXT PRIMARY KEY, value TEXT)")
-                bubble_data = {
-                    "type": 1,
-                    "text": "Hello from global",
-                    "createdAt": 1609459200000
-                }
-                cur.execute("INSERT INTO cursorDiskKV (key, value) VALUES (?, ?)",
-                           ("bubbleId:test_composer_123:bubble1", json.dumps(bubble_data)))
-                con.commit()
-                con.close()
-                
-                result = finder._parse_chat_full(("test_composer_123", str(db_path), "(global)"))
-                # May return None if no messages found, or dict if successful
-                assert result is None or isinstance(result, dict)
-        finally:
-            # Ensure database is closed before unlinking
-            if db_path and db_path.exists():
-                try:
-                    db_path.unlink()
-                except:
-                    pass
+        _insert_json(global_db, "cursorDiskKV", ("bubbleId:test_composer_123:bubble1", _GLOBAL_BUBBLE_JSON))
+        
+        result = finder._parse_chat_full(("test_composer_123", str(global_db), "(global)"))
+        # May return None if no messages found, or dict if successful
+        assert result is None or isinstance(result, dict)
     
-    def test_generate_chat_id_path_normalization(self):
+    def test_generate_chat_id_path_normalization(self, finder):
         """Test that chat ID generation normalizes paths."""
-        finder = CursorChatFinder()
         # Test with different path formats
         tuple1 = ("composer_123", "C:\\Users\\test\\db.vscdb", "workspace")
         tuple2 = ("composer_123", "C:/Users/test/db.vscdb", "workspace")
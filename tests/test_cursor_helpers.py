@@ -1,490 +1,299 @@
 #!/usr/bin/env python3
 """
 Tests for helper functions in cursor_chats_finder.py
+
+Every test here is close to pure CPU work. The SQLite data lives in memory,
+and the one on-disk layout is built once per session and only read. Tests
+share no state across workers, so the module is safe to fan out with
+``pytest -n auto``.
 """
 
 import pytest
 import json
 import pathlib
 import sqlite3
-import tempfile
+import datetime
+from contextlib import closing
 from src.domain.cursor_chats_finder import (
     j,
     extract_text_from_richtext,
     extract_tool_info,
     cursor_root,
-    global_storage_path
+    global_storage_path,
+    timestamp_to_iso,
+    get_timezone_offset,
+    transform_chat_to_export_format
 )
 from unittest.mock import patch
 
+pytestmark = pytest.mark.unit
 
-class TestHelperFunctions:
-    """Test helper functions in cursor_chats_finder."""
-    
-    def test_j_function_with_valid_data(self):
-        """Test j() helper function with valid JSON data."""
-        db_path = None
-        try:
-            with tempfile.NamedTemporaryFile(suffix='.vscdb', delete=False) as f:
-                db_path = pathlib.Path(f.name)
-                f.close()
-            
-            con = sqlite3.connect(str(db_path))
-            try:
-                cur = con.cursor()
-                cur.execute("CREATE TABLE IF NOT EXISTS ItemTable (key TEXT PRIMARY KEY, value TEXT)")
-                test_data = {"test": "value", "number": 123}
-                cur.execute("INSERT INTO ItemTable (key, value) VALUES (?, ?)",
-                           ("test.key", json.dumps(test_data)))
-                con.commit()
-                
-                result = j(cur, "ItemTable", "test.key")
-                assert result == test_data
-            finally:
-                con.close()
-        finally:
-            if db_path and db_path.exists():
-                import time
-                time.sleep(0.1)
-                try:
-                    db_path.unlink()
-                except:
-                    pass
-    
-    def test_j_function_with_invalid_json(self):
-        """Test j() helper function with invalid JSON."""
-        db_path = None
-        try:
-            with tempfile.NamedTemporaryFile(suffix='.vscdb', delete=False) as f:
-                db_path = pathlib.Path(f.name)
-                f.close()
-            
-            con = sqlite3.connect(str(db_path))
-            try:
-                cur = con.cursor()
-                cur.execute("CREATE TABLE IF NOT EXISTS ItemTable (key TEXT PRIMARY KEY, value TEXT)")
-                cur.execute("INSERT INTO ItemTable (key, value) VALUES (?, ?)",
-                           ("test.key", "invalid json"))
-                con.commit()
-                
-                result = j(cur, "ItemTable", "test.key")
-                assert result is None
-            finally:
-                con.close()
-        finally:
-            if db_path and db_path.exists():
-                import time
-                time.sleep(0.1)
-                try:
-                    db_path.unlink()
-                except:
-                    pass
-    
-    def test_j_function_with_missing_key(self):
-        """Test j() helper function with missing key."""
-        db_path = None
-        try:
-            with tempfile.NamedTemporaryFile(suffix='.vscdb', delete=False) as f:
-                db_path = pathlib.Path(f.name)
-                f.close()
-            
-            con = sqlite3.connect(str(db_path))
-            try:
-                cur = con.cursor()
-                cur.execute("CREATE TABLE IF NOT EXISTS ItemTable (key TEXT PRIMARY KEY, value TEXT)")
-                con.commit()
-                
-                result = j(cur, "ItemTable", "nonexistent.key")
-                assert result is None
-            finally:
-                con.close()
-        finally:
-            if db_path and db_path.exists():
-                import time
-                time.sleep(0.1)
-                try:
-                    db_path.unlink()
-                except:
-                    pass
-    
-    def test_extract_text_from_richtext_string(self):
-        """Test extract_text_from_richtext with plain string."""
-        result = extract_text_from_richtext("Hello world")
-        assert result == "Hello world"
-    
-    def test_extract_text_from_richtext_json_string(self):
-        """Test extract_text_from_richtext with JSON string."""
-        richtext_json = json.dumps({"root": {"children": [{"text": "Hello"}]}})
-        result = extract_text_from_richtext(richtext_json)
-        assert "Hello" in result
-    
-    def test_extract_text_from_richtext_dict(self):
-        """Test extract_text_from_richtext with dict format."""
-        richtext = {
-            "root": {
-                "children": [
-                    {"text": "Hello"},
-                    {"text": "World"}
-                ]
-            }
-        }
-        result = extract_text_from_richtext(richtext)
-        assert "Hello" in result
-        assert "World" in result
-    
-    def test_extract_text_from_richtext_nested_children(self):
-        """Test extract_text_from_richtext with nested children."""
-        richtext = {
-            "root": {
-                "children": [
-                    {
-                        "text": "Parent",
-                        "children": [
-                            {"text": "Child1"},
-                            {"text": "Child2"}
-                        ]
-                    }
-                ]
-            }
-        }
-        result = extract_text_from_richtext(richtext)
-        assert "Parent" in result
-        assert "Child1" in result
-        assert "Child2" in result
-    
-    def test_extract_text_from_richtext_invalid_json_string(self):
-        """Test extract_text_from_richtext with invalid JSON string."""
-        result = extract_text_from_richtext("not valid json {")
-        assert result == "not valid json {"
-    
-    def test_extract_text_from_richtext_empty(self):
-        """Test extract_text_from_richtext with empty/None values."""
-        assert extract_text_from_richtext(None) == ""
-        assert extract_text_from_richtext("") == ""
-        assert extract_text_from_richtext({}) == ""
-    
-    def test_extract_tool_info_with_tool_former_data(self):
-        """Test extract_tool_info with toolFormerData."""
-        bubble = {
-            "toolFormerData": {
-                "name": "test_tool",
-                "params": {"arg1": "value1"},
-                "result": "Tool output"
-            }
-        }
-        result = extract_tool_info(bubble)
-        assert result is not None
-        assert result["tool_name"] == "read"
-        assert result["tool_input"] == {"arg1": "value1"}
-        # Read tools return empty output
-        assert result["tool_output"] == ""
-    
-    def test_extract_tool_info_with_string_params(self):
-        """Test extract_tool_info with string params."""
-        bubble = {
-            "toolFormerData": {
-                "name": "test_tool",
-                "params": '{"arg1": "value1"}',
-                "result": "output"
-            }
-        }
-        result = extract_tool_info(bubble)
-        assert result is not None
-        assert result["tool_input"] == {"arg1": "value1"}
-    
-    def test_extract_tool_info_with_invalid_json_params(self):
-        """Test extract_tool_info with invalid JSON in params."""
-        bubble = {
-            "toolFormerData": {
-                "name": "test_tool",
-                "params": "invalid json {",
-                "result": "output"
-            }
-        }
-        result = extract_tool_info(bubble)
-        assert result is not None
-        assert result["tool_input"] == {"raw": "invalid json {"}
-    
-    def test_extract_tool_info_with_raw_args(self):
-        """Test extract_tool_info with rawArgs."""
-        bubble = {
-            "toolFormerData": {
-                "name": "test_tool",
-                "rawArgs": {"arg1": "value1"},
-                "result": "output"
-            }
-        }
-        result = extract_tool_info(bubble)
+
+_BASE_CHAT_JSON = json.dumps({
+    "session": {
+        "composerId": "test_composer_123",
+        "createdAt": 1609459200000
+    },
+    "project": {"name": "Test Project"},
+    "messages": [{"role": "user", "type": "text", "content": "Hello"}]
+})
+
+
+@pytest.fixture
+def base_chat():
+    """Minimal chat accepted by transform_chat_to_export_format; tests override what they exercise."""
+    return json.loads(_BASE_CHAT_JSON)
+
+
+@pytest.fixture
+def mock_platform(request):
+    """Patch platform.system and Path.home with the (system, home) given as the param."""
+    system, home = request.param
+    with patch('platform.system', return_value=system), \
+         patch('pathlib.Path.home', return_value=pathlib.Path(home)):
+        yield
+
+
+@pytest.fixture(scope="session")
+def cursor_storage_tree(tmp_path_factory):
+    """Read-only Cursor storage root containing User/globalStorage/state.vscdb."""
+    base = tmp_path_factory.mktemp("cursor")
+    global_storage = base / "User" / "globalStorage"
+    global_storage.mkdir(parents=True)
+    (global_storage / "state.vscdb").touch()
+    return base
+
+
+@pytest.fixture(scope="module")
+def memdb():
+    """Cursor on an in-memory ItemTable seeded once with the j() test rows."""
+    with closing(sqlite3.connect(":memory:")) as con:
+        con.executescript(
+            "PRAGMA journal_mode=MEMORY; PRAGMA synchronous=OFF; PRAGMA temp_store=MEMORY;"
+            "CREATE TABLE ItemTable (key TEXT PRIMARY KEY, value TEXT);"
+        )
+        con.executemany("INSERT INTO ItemTable (key, value) VALUES (?, ?)", [
+            ("valid", json.dumps({"test": "value", "number": 123})),
+            ("invalid", "invalid json"),
+            ("bigint", '{"n": 18446744073709551616}'),
+        ])
+        con.commit()
+        yield con.cursor()
+
+
+@pytest.mark.parametrize("key,expected", [
+    ("valid", {"test": "value", "number": 123}),
+    ("invalid", None),
+    ("nonexistent.key", None),
+    ("bigint", {"n": 2 ** 64}),  # beyond orjson's range; parsed by the stdlib fallback
+], ids=["valid_data", "invalid_json", "missing_key", "bigint"])
+def test_j_function(memdb, key, expected):
+    """Test j() helper function with valid, invalid and missing JSON values."""
+    assert j(memdb, "ItemTable", key) == expected
+
+
+@pytest.mark.parametrize("richtext,exact,substrings", [
+    ("Hello world", "Hello world", ()),
+    (json.dumps({"root": {"children": [{"text": "Hello"}]}}), None, ("Hello",)),
+    ({"root": {"children": [{"text": "Hello"}, {"text": "World"}]}}, None, ("Hello", "World")),
+    ({"root": {"children": [{
+        "text": "Parent",
+        "children": [{"text": "Child1"}, {"text": "Child2"}]
+    }]}}, None, ("Parent", "Child1", "Child2")),
+    ("not valid json {", "not valid json {", ()),
+    (None, "", ()),
+    ("", "", ()),
+    ({}, "", ()),
+], ids=["string", "json_string", "dict", "nested_children", "invalid_json_string",
+        "none", "empty_string", "empty_dict"])
+def test_extract_text_from_richtext(richtext, exact, substrings):
+    """Test extract_text_from_richtext across plain, JSON, Lexical and empty inputs."""
+    result = extract_text_from_richtext(richtext)
+    if exact is not None:
+        assert result == exact
+    assert all(text in result for text in substrings)
+
+
+@pytest.mark.parametrize("bubble,expected", [
+    # Read tools return empty output
+    ({"toolFormerData": {"name": "test_tool", "params": {"arg1": "value1"}, "result": "Tool output"}},
+     {"tool_name": "read", "tool_input": {"arg1": "value1"}, "tool_output": ""}),
+    ({"toolFormerData": {"name": "test_tool", "params": '{"arg1": "value1"}', "result": "output"}},
+     {"tool_input": {"arg1": "value1"}}),
+    ({"toolFormerData": {"name": "test_tool", "params": "invalid json {", "result": "output"}},
+     {"tool_input": {"raw": "invalid json {"}}),
+    ({"toolFormerData": {"name": "test_tool", "rawArgs": {"arg1": "value1"}, "result": "output"}},
+     {"tool_input": {"arg1": "value1"}}),
+    # Dict results are converted to JSON but then normalized to empty for read tools
+    ({"toolFormerData": {"name": "test_tool", "result": {"key": "value"}}},
+     {"tool_output": ""}),
+    ({"toolFormerData": {"name": "test_tool", "result": 12345}},
+     {"tool_output": ""}),
+    ({"tool": "test_tool", "toolName": "test_tool", "toolInput": {"arg": "value"}, "toolOutput": "output"},
+     {"tool_name": "read"}),
+    ({"text": "Just text"}, None),
+], ids=["tool_former_data", "string_params", "invalid_json_params", "raw_args",
+        "dict_result", "non_string_result", "legacy_fields", "no_tool"])
+def test_extract_tool_info(bubble, expected):
+    """Test extract_tool_info across the bubble shapes Cursor stores."""
+    result = extract_tool_info(bubble)
+    if expected is None:
+        assert result is None
+    else:
         assert result is not None
-        assert result["tool_input"] == {"arg1": "value1"}
-    
-    def test_extract_tool_info_with_dict_result(self):
-        """Test extract_tool_info with dict result."""
-        bubble = {
-            "toolFormerData": {
-                "name": "test_tool",
-                "result": {"key": "value"}
+        assert {key: result[key] for key in expected} == expected
+
+
+def test_extract_tool_info_serializes_dict_result():
+    """Test that dict results reach output normalization as JSON text."""
+    bubble = {"toolFormerData": {"name": "test_tool", "result": {"key": "value"}}}
+    with patch('src.domain.cursor_chats_finder._normalize_cursor_tool_usage',
+               side_effect=lambda name, tool_input, tool_output: tool_output) as normalize:
+        tool_output = extract_tool_info(bubble)
+    normalize.assert_called_once()
+    assert json.loads(tool_output) == {"key": "value"}
+
+
+@pytest.mark.parametrize("mock_platform,expected", [
+    (("Windows", "C:/Users/test"), pathlib.Path("C:/Users/test/AppData/Roaming/Cursor")),
+    (("Darwin", "/Users/test"), pathlib.Path("/Users/test/Library/Application Support/Cursor")),
+    (("Linux", "/home/test"), pathlib.Path("/home/test/.config/Cursor")),
+    (("Unknown", "/home/test"), None),
+], indirect=["mock_platform"])
+def test_cursor_root(mock_platform, expected):
+    """Test cursor_root on each supported platform and on an unsupported one."""
+    if expected is None:
+        with pytest.raises(RuntimeError, match="Unsupported OS"):
+            cursor_root()
+    else:
+        assert cursor_root() == expected
+
+
+def test_global_storage_path(cursor_storage_tree):
+    """Test global_storage_path function."""
+    result = global_storage_path(cursor_storage_tree)
+    assert result == cursor_storage_tree / "User" / "globalStorage" / "state.vscdb"
+
+
+def test_timestamp_to_iso_milliseconds():
+    """Test timestamp_to_iso with milliseconds."""
+    # Test with milliseconds (> 1e10)
+    timestamp_ms = 1609459200000  # 2021-01-01 00:00:00 UTC in milliseconds
+    result = timestamp_to_iso(timestamp_ms)
+    assert result.endswith('Z')
+    assert datetime.datetime.fromisoformat(result.rstrip('Z')) == datetime.datetime(2021, 1, 1)
+
+
+def test_timestamp_to_iso_seconds():
+    """Test timestamp_to_iso with seconds."""
+    # Test with seconds (< 1e10)
+    timestamp_sec = 1609459200  # 2021-01-01 00:00:00 UTC in seconds
+    result = timestamp_to_iso(timestamp_sec)
+    assert result.endswith('Z')
+    assert datetime.datetime.fromisoformat(result.rstrip('Z')) == datetime.datetime(2021, 1, 1)
+
+
+def test_timestamp_to_iso_none():
+    """Test timestamp_to_iso with None."""
+    default_time = datetime.datetime(2021, 1, 1, 12, 0, 0, tzinfo=datetime.timezone.utc)
+    result = timestamp_to_iso(None, default_time)
+    assert result.endswith('Z')
+    assert datetime.datetime.fromisoformat(result.rstrip('Z')) == datetime.datetime(2021, 1, 1, 12, 0, 0)
+
+
+def test_timestamp_to_iso_invalid():
+    """Test timestamp_to_iso with invalid type."""
+    default_time = datetime.datetime(2021, 1, 1, 12, 0, 0)
+    result = timestamp_to_iso("invalid", default_time)
+    assert result.endswith('Z')
+    assert datetime.datetime.fromisoformat(result.rstrip('Z')) == default_time
+
+
+def test_get_timezone_offset():
+    """Test get_timezone_offset function."""
+    result = get_timezone_offset()
+    assert result.startswith("UTC")
+    assert result[3] in ['+', '-']
+
+
+def test_transform_chat_to_export_format(base_chat):
+    """Test transform_chat_to_export_format function."""
+    chat = base_chat
+    chat["session"]["title"] = "Test Chat"
+    chat["messages"].append({"role": "assistant", "type": "text", "content": "Hi there"})
+    
+    result = transform_chat_to_export_format(chat)
+    assert "title" in result
+    assert result["title"] == "Test Chat"
+    assert "metadata" in result
+    assert "createdAt" in result
+    assert "messages" in result
+    assert len(result["messages"]) == 2
+
+
+def test_transform_chat_to_export_format_no_title(base_chat):
+    """Test transform_chat_to_export_format with no title."""
+    result = transform_chat_to_export_format(base_chat)
+    assert "Chat test_com" in result["title"]
+
+
+def test_transform_chat_to_export_format_with_tool(base_chat):
+    """Test transform_chat_to_export_format with tool message."""
+    chat = base_chat
+    chat["messages"] = [
+        {
+            "role": "assistant",
+            "type": "tool",
+            "content": {
+                "tool_name": "read",
+                "tool_input": {"arg": "value"},
+                "tool_output": ""
             }
         }
-        result = extract_tool_info(bubble)
-        assert result is not None
-        # Read tools return empty output (dict is converted to JSON but then normalized to empty)
-        assert result["tool_output"] == ""
-    
-    def test_extract_tool_info_with_legacy_fields(self):
-        """Test extract_tool_info with legacy tool fields."""
-        bubble = {
-            "tool": "test_tool",
-            "toolName": "test_tool",
-            "toolInput": {"arg": "value"},
-            "toolOutput": "output"
-        }
-        result = extract_tool_info(bubble)
-        assert result is not None
-        assert result["tool_name"] == "read"
-    
-    def test_extract_tool_info_no_tool(self):
-        """Test extract_tool_info with no tool data."""
-        bubble = {"text": "Just text"}
-        result = extract_tool_info(bubble)
-        assert result is None
-    
-    def test_cursor_root_windows(self):
-        """Test cursor_root on Windows."""
-        with patch('platform.system', return_value='Windows'), \
-             patch('pathlib.Path.home', return_value=pathlib.Path("C:/Users/test")):
-            result = cursor_root()
-            expected = pathlib.Path("C:/Users/test/AppData/Roaming/Cursor")
-            assert result == expected
-    
-    def test_cursor_root_darwin(self):
-        """Test cursor_root on macOS."""
-        with patch('platform.system', return_value='Darwin'), \
-             patch('pathlib.Path.home', return_value=pathlib.Path("/Users/test")):
-            result = cursor_root()
-            expected = pathlib.Path("/Users/test/Library/Application Support/Cursor")
-            assert result == expected
-    
-    def test_cursor_root_linux(self):
-        """Test cursor_root on Linux."""
-        with patch('platform.system', return_value='Linux'), \
-             patch('pathlib.Path.home', return_value=pathlib.Path("/home/test")):
-            result = cursor_root()
-            expected = pathlib.Path("/home/test/.config/Cursor")
-            assert result == expected
-    
-    def test_cursor_root_unsupported(self):
-        """Test cursor_root on unsupported OS."""
-        with patch('platform.system', return_value='Unknown'):
-            with pytest.raises(RuntimeError, match="Unsupported OS"):
-                cursor_root()
-    
-    def test_global_storage_path(self):
-        """Test global_storage_path function."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            base = pathlib.Path(tmpdir)
-            user_dir = base / "User"
-            user_dir.mkdir()
-            global_storage = user_dir / "globalStorage"
-            global_storage.mkdir()
-            db_file = global_storage / "state.vscdb"
-            db_file.touch()
-            
-            result = global_storage_path(base)
-            assert result == db_file
-    
-    def test_timestamp_to_iso_milliseconds(self):
-        """Test timestamp_to_iso with milliseconds."""
-        from src.domain.cursor_chats_finder import timestamp_to_iso
-        import datetime
-        
-        # Test with milliseconds (> 1e10)
-        timestamp_ms = 1609459200000  # 2021-01-01 00:00:00 UTC in milliseconds
-        result = timestamp_to_iso(timestamp_ms)
-        assert result.endswith('Z')
-        assert '2021-01-01' in result
+    ]
     
-    def test_timestamp_to_iso_seconds(self):
-        """Test timestamp_to_iso with seconds."""
-        from src.domain.cursor_chats_finder import timestamp_to_iso
-        
-        # Test with seconds (< 1e10)
-        timestamp_sec = 1609459200  # 2021-01-01 00:00:00 UTC in seconds
-        result = timestamp_to_iso(timestamp_sec)
-        assert result.endswith('Z')
-        assert '2021-01-01' in result
-    
-    def test_timestamp_to_iso_none(self):
-        """Test timestamp_to_iso with None."""
-        from src.domain.cursor_chats_finder import timestamp_to_iso
-        import datetime
-        
-        default_time = datetime.datetime(2021, 1, 1, 12, 0, 0, tzinfo=datetime.timezone.utc)
-        result = timestamp_to_iso(None, default_time)
-        assert result.endswith('Z')
-        assert '2021-01-01' in result
-    
-    def test_timestamp_to_iso_invalid(self):
-        """Test timestamp_to_iso with invalid type."""
-        from src.domain.cursor_chats_finder import timestamp_to_iso
-        import datetime
-        
-        default_time = datetime.datetime(2021, 1, 1, 12, 0, 0)
-        result = timestamp_to_iso("invalid", default_time)
-        assert result.endswith('Z')
-    
-    def test_get_timezone_offset(self):
-        """Test get_timezone_offset function."""
-        from src.domain.cursor_chats_finder import get_timezone_offset
-        
-        result = get_timezone_offset()
-        assert result.startswith("UTC")
-        assert result[3] in ['+', '-']
-    
-    def test_transform_chat_to_export_format(self):
-        """Test transform_chat_to_export_format function."""
-        from src.domain.cursor_chats_finder import transform_chat_to_export_format
-        
-        chat = {
-            "session": {
-                "composerId": "test_composer_123",
-                "title": "Test Chat",
-                "createdAt": 1609459200000
-            },
-            "project": {
-                "name": "Test Project"
-            },
-            "messages": [
-                {"role": "user", "type": "text", "content": "Hello"},
-                {"role": "assistant", "type": "text", "content": "Hi there"}
-            ]
-        }
-        
-        result = transform_chat_to_export_format(chat)
-        assert "title" in result
-        assert result["title"] == "Test Chat"
-        assert "metadata" in result
-        assert "createdAt" in result
-        assert "messages" in result
-        assert len(result["messages"]) == 2
-    
-    def test_transform_chat_to_export_format_no_title(self):
-        """Test transform_chat_to_export_format with no title."""
-        from src.domain.cursor_chats_finder import transform_chat_to_export_format
-        
-        chat = {
-            "session": {
-                "composerId": "test_composer_123",
-                "createdAt": 1609459200000
-            },
-            "project": {"name": "Test Project"},
-            "messages": [{"role": "user", "type": "text", "content": "Hello"}]
-        }
-        
-        result = transform_chat_to_export_format(chat)
-        assert "Chat test_com" in result["title"]
-    
-    def test_transform_chat_to_export_format_with_tool(self):
-        """Test transform_chat_to_export_format with tool message."""
-        from src.domain.cursor_chats_finder import transform_chat_to_export_format
-        
-        chat = {
-            "session": {
-                "composerId": "test_composer_123",
-                "createdAt": 1609459200000
-            },
-            "project": {"name": "Test Project"},
-            "messages": [
-                {
-                    "role": "assistant",
-                    "type": "tool",
-                    "content": {
-                        "tool_name": "read",
-                        "tool_input": {"arg": "value"},
-                        "tool_output": ""
-                    }
-                }
-            ]
-        }
-        
-        result = transform_chat_to_export_format(chat)
-        assert len(result["messages"]) == 1
-        assert result["messages"][0]["type"] == "tool"
-        assert result["messages"][0]["content"]["tool_name"] == "read"
-    
-    def test_transform_chat_to_export_format_skip_invalid_content(self):
-        """Test transform_chat_to_export_format skips invalid content."""
-        from src.domain.cursor_chats_finder import transform_chat_to_export_format
-        
-        chat = {
-            "session": {
-                "composerId": "test_composer_123",
-                "createdAt": 1609459200000
-            },
-            "project": {"name": "Test Project"},
-            "messages": [
-                {"role": "user", "type": "text", "content": ""},  # Empty
-                {"role": "user", "type": "text", "content": None},  # None
-                {"role": "user", "type": "text", "content": 123},  # Not string
-                {"role": "user", "type": "text", "content": "Valid"}
-            ]
-        }
-        
-        result = transform_chat_to_export_format(chat)
-        # Should only have one valid message
-        assert len(result["messages"]) == 1
-        assert result["messages"][0]["content"] == "Valid"
-    
-    def test_transform_chat_to_export_format_seconds_timestamp(self):
-        """Test transform_chat_to_export_format with seconds timestamp."""
-        from src.domain.cursor_chats_finder import transform_chat_to_export_format
-        
-        chat = {
-            "session": {
-                "composerId": "test_composer_123",
-                "createdAt": 1609459200  # seconds, not milliseconds
-            },
-            "project": {"name": "Test Project"},
-            "messages": [{"role": "user", "type": "text", "content": "Hello"}]
-        }
-        
-        result = transform_chat_to_export_format(chat)
-        assert "createdAt" in result
-        assert result["createdAt"].endswith('Z')
-    
-    def test_transform_chat_to_export_format_unknown_project(self):
-        """Test transform_chat_to_export_format with unknown project."""
-        from src.domain.cursor_chats_finder import transform_chat_to_export_format
-        
-        chat = {
-            "session": {
-                "composerId": "test_composer_123",
-                "createdAt": 1609459200000
-            },
-            "project": {"name": "(unknown)"},
-            "messages": [{"role": "user", "type": "text", "content": "Hello"}]
-        }
-        
-        result = transform_chat_to_export_format(chat)
-        assert result["metadata"]["Project"] == "Unknown Project"
-    
-    def test_global_storage_path_not_found(self):
-        """Test global_storage_path when not found."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            base = pathlib.Path(tmpdir)
-            result = global_storage_path(base)
-            assert result is None
+    result = transform_chat_to_export_format(chat)
+    assert len(result["messages"]) == 1
+    assert result["messages"][0]["type"] == "tool"
+    assert result["messages"][0]["content"]["tool_name"] == "read"
+
+
+def test_transform_chat_to_export_format_skip_invalid_content(base_chat):
+    """Test transform_chat_to_export_format skips invalid content."""
+    chat = base_chat
+    chat["messages"] = [
+        {"role": "user", "type": "text", "content": ""},  # Empty
+        {"role": "user", "type": "text", "content": None},  # None
+        {"role": "user", "type": "text", "content": 123},  # Not string
+        {"role": "user", "type": "text", "content": "Valid"}
+    ]
+    
+    result = transform_chat_to_export_format(chat)
+    # Should only have one valid message
+    assert len(result["messages"]) == 1
+    assert result["messages"][0]["content"] == "Valid"
+
+
+def test_transform_chat_to_export_format_seconds_timestamp(base_chat):
+    """Test transform_chat_to_export_format with seconds timestamp."""
+    chat = base_chat
+    chat["session"]["createdAt"] = 1609459200  # seconds, not milliseconds
+    
+    result = transform_chat_to_export_format(chat)
+    assert "createdAt" in result
+    assert result["createdAt"].endswith('Z')
+
+
+def test_transform_chat_to_export_format_unknown_project(base_chat):
+    """Test transform_chat_to_export_format with unknown project."""
+    chat = base_chat
+    chat["project"]["name"] = "(unknown)"
     
-    def test_extract_tool_info_with_non_string_result(self):
-        """Test extract_tool_info with non-string result."""
-        bubble = {
-            "toolFormerData": {
-                "name": "test_tool",
-                "result": 12345  # Not a string or dict
-            }
-        }
-        result = extract_tool_info(bubble)
-        assert result is not None
-        # Read tools return empty output
-        assert result["tool_output"] == ""
+    result = transform_chat_to_export_format(chat)
+    assert result["metadata"]["Project"] == "Unknown Project"
+
 
+def test_global_storage_path_not_found():
+    """Test global_storage_path when not found."""
+    result = global_storage_path(pathlib.Path("/nonexistent/path/definitely/not/here"))
+    assert result is None
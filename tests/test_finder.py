@@ -8,36 +8,32 @@ import json
 import pathlib
 import tempfile
 import sys
+from functools import lru_cache
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock
+from src.domain.claude_chat_finder import ClaudeChatFinder
 from src.presentation.finder import get_finder, main
 
 
+@pytest.fixture(scope="session")
+def cached_get_finder():
+    """get_finder memoized per type string, so each finder is built once per session."""
+    return lru_cache(maxsize=None)(get_finder)
+
+
 class TestGetFinder:
     """Test cases for get_finder function."""
     
-    def test_get_finder_claude(self):
-        """Test getting Claude finder."""
-        finder = get_finder("claude")
-        assert finder._finder_type == "claude"
-    
-    def test_get_finder_copilot(self):
-        """Test getting Copilot finder."""
-        finder = get_finder("copilot")
-        assert finder._finder_type == "copilot"
-    
-    def test_get_finder_cursor(self):
-        """Test getting Cursor finder."""
-        finder = get_finder("cursor")
-        assert finder._finder_type == "cursor"
+    @pytest.mark.parametrize("finder_type", ["claude", "copilot", "cursor"])
+    def test_get_finder(self, cached_get_finder, finder_type):
+        """Test getting each supported finder."""
+        finder = cached_get_finder(finder_type)
+        assert finder._finder_type == finder_type
     
-    def test_get_finder_case_insensitive(self):
+    @pytest.mark.parametrize("finder_type", ["CLAUDE", "Claude", "claude"])
+    def test_get_finder_case_insensitive(self, cached_get_finder, finder_type):
         """Test that finder type is case insensitive."""
-        finder1 = get_finder("CLAUDE")
-        finder2 = get_finder("Claude")
-        finder3 = get_finder("claude")
-        assert finder1._finder_type == "claude"
-        assert finder2._finder_type == "claude"
-        assert finder3._finder_type == "claude"
+        assert cached_get_finder(finder_type)._finder_type == "claude"
     
     def test_get_finder_invalid_type(self):
         """Test that invalid finder type raises ValueError."""
@@ -45,92 +41,121 @@ class TestGetFinder:
             get_finder("invalid")
 
 
+_MOCKED_FINDER_METHODS = ('parse_chat_by_id', '_get_default_output_path')
+
+
+@pytest.fixture(scope="module")
+def _shared_mock_finder():
+    """One ClaudeChatFinder-specced mock, built once for the module."""
+    return MagicMock(spec=ClaudeChatFinder)
+
+
+@pytest.fixture
+def install_finder(monkeypatch):
+    """Return a helper that makes get_finder hand back the given finder stand-in."""
+    def install(finder):
+        monkeypatch.setattr('src.presentation.finder.get_finder', lambda finder_type: finder)
+        return finder
+    return install
+
+
+@pytest.fixture
+def mock_finder(_shared_mock_finder, install_finder):
+    """The shared mock finder, reset and returned by get_finder for this test."""
+    # reset_mock() does not clear child return values, so reset each stubbed method
+    for name in _MOCKED_FINDER_METHODS:
+        getattr(_shared_mock_finder, name).reset_mock(return_value=True, side_effect=True)
+    _shared_mock_finder.reset_mock()
+    return install_finder(_shared_mock_finder)
+
+
+def _chat_not_found(chat_id):
+    raise ValueError("Chat not found")
+
+
 class TestMain:
     """Test cases for main function."""
     
-    def test_main_list_mode(self, capsys):
+    @pytest.fixture(autouse=True)
+    def _argv(self, monkeypatch, request):
+        """Set sys.argv from the test's argv marker."""
+        marker = request.node.get_closest_marker("argv")
+        if marker is not None:
+            monkeypatch.setattr(sys, 'argv', ['finder.py', *marker.args])
+    
+    @pytest.mark.argv('--type', 'claude')
+    def test_main_list_mode(self, capfd, install_finder):
         """Test main function in list mode (no --export, no --out)."""
-        with patch('sys.argv', ['finder.py', '--type', 'claude']), \
-             patch('src.presentation.finder.get_finder') as mock_get_finder:
-            mock_finder = MagicMock()
-            mock_finder.get_chat_metadata_list.return_value = [
-                {'id': '123', 'title': 'Test Chat', 'date': '2024-01-01'}
-            ]
-            mock_get_finder.return_value = mock_finder
-            
-            result = main()
-            assert result == 0
-            
-            captured = capsys.readouterr()
-            assert "Found 1 chats:" in captured.out
-            assert "123" in captured.out
-            assert "Test Chat" in captured.out
+        install_finder(SimpleNamespace(
+            get_chat_metadata_list=lambda: [{'id': '123', 'title': 'Test Chat', 'date': '2024-01-01'}],
+            save_chat_list=lambda metadata_list, finder_type: pathlib.Path('/tmp/claude_chats.json'),
+        ))
+        
+        result = main()
+        assert result == 0
+        
+        captured = capfd.readouterr()
+        assert "Found 1 chats:" in captured.out
+        assert "123" in captured.out
+        assert "Test Chat" in captured.out
     
-    def test_main_export_mode(self, capsys):
+    @pytest.mark.argv('--type', 'claude', '--export', 'test_id')
+    def test_main_export_mode(self, capfd, mock_finder):
         """Test main function in export mode (--export specified)."""
-        with patch('sys.argv', ['finder.py', '--type', 'claude', '--export', 'test_id']), \
-             patch('src.presentation.finder.get_finder') as mock_get_finder:
-            mock_finder = MagicMock()
-            mock_finder.parse_chat_by_id.return_value = {'title': 'Test Chat', 'messages': []}
-            mock_finder._get_default_output_path.return_value = pathlib.Path('/tmp/test.json')
-            mock_get_finder.return_value = mock_finder
+        mock_finder.parse_chat_by_id.return_value = {'title': 'Test Chat', 'messages': []}
+        mock_finder._get_default_output_path.return_value = pathlib.Path('/tmp/test.json')
+        
+        with patch('pathlib.Path.write_text') as mock_write:
+            result = main()
+            assert result == 0
+            mock_write.assert_called_once()
             
-            with patch('pathlib.Path.write_text') as mock_write:
-                result = main()
-                assert result == 0
-                mock_write.assert_called_once()
-                
-                captured = capsys.readouterr()
-                assert "Exported chat test_id" in captured.out
+            captured = capfd.readouterr()
+            assert "Exported chat test_id" in captured.out
     
-    def test_main_export_mode_error(self, capsys):
+    @pytest.mark.argv('--type', 'claude', '--export', 'test_id')
+    def test_main_export_mode_error(self, capfd, install_finder):
         """Test main function in export mode with error."""
-        with patch('sys.argv', ['finder.py', '--type', 'claude', '--export', 'test_id']), \
-             patch('src.presentation.finder.get_finder') as mock_get_finder:
-            mock_finder = MagicMock()
-            mock_finder.parse_chat_by_id.side_effect = ValueError("Chat not found")
-            mock_get_finder.return_value = mock_finder
-            
-            result = main()
-            assert result == 1
-            
-            captured = capsys.readouterr()
-            assert "Error:" in captured.out
+        install_finder(SimpleNamespace(parse_chat_by_id=_chat_not_found))
+        
+        result = main()
+        assert result == 1
+        
+        captured = capfd.readouterr()
+        assert "Error:" in captured.out
     
-    def test_main_export_all_mode(self, capsys):
+    @pytest.mark.argv('--type', 'claude', '--out', '/tmp/output.json')
+    def test_main_export_all_mode(self, install_finder):
         """Test main function in export all mode (--out specified)."""
-        with patch('sys.argv', ['finder.py', '--type', 'claude', '--out', '/tmp/output.json']), \
-             patch('src.presentation.finder.get_finder') as mock_get_finder:
-            mock_finder = MagicMock()
-            mock_finder.export_chats.return_value = [{'title': 'Chat 1'}, {'title': 'Chat 2'}]
-            mock_get_finder.return_value = mock_finder
-            
-            with patch('pathlib.Path') as mock_path:
-                mock_path.return_value.exists.return_value = False
-                result = main()
-                assert result == 0
-                
-                captured = capsys.readouterr()
-                assert "Extracted 2 claude chat sessions" in captured.out
+        prepared, exported = [], []
+        install_finder(SimpleNamespace(
+            _ensure_output_dir=prepared.append,
+            export_chats=lambda path: exported.append(path) or [{'title': 'Chat 1'}, {'title': 'Chat 2'}],
+        ))
+        
+        result = main()
+        assert result == 0
+        
+        # Checked at the write boundary: the --out path reaches the exporter
+        out = pathlib.Path('/tmp/output.json')
+        assert prepared == [out]
+        assert exported == [out]
     
-    def test_main_export_all_mode_no_export_chats(self, capsys):
+    @pytest.mark.argv('--type', 'claude', '--out', '/tmp/output.json')
+    def test_main_export_all_mode_no_export_chats(self, capfd, install_finder):
         """Test main function when finder doesn't support export_chats."""
-        with patch('sys.argv', ['finder.py', '--type', 'claude', '--out', '/tmp/output.json']), \
-             patch('src.presentation.finder.get_finder') as mock_get_finder:
-            mock_finder = MagicMock()
-            del mock_finder.export_chats  # Remove the method
-            mock_get_finder.return_value = mock_finder
-            
-            result = main()
-            assert result == 1
-            
-            captured = capsys.readouterr()
-            assert "does not support bulk export" in captured.out
+        # No export_chats attribute at all
+        install_finder(SimpleNamespace(_ensure_output_dir=lambda path: None))
+        
+        result = main()
+        assert result == 1
+        
+        captured = capfd.readouterr()
+        assert "does not support bulk export" in captured.out
     
-    def test_main_invalid_finder_type(self, capsys):
+    @pytest.mark.argv('--type', 'invalid')
+    def test_main_invalid_finder_type(self):
         """Test main function with invalid finder type."""
         # argparse validates choices before we can catch it, so it exits with SystemExit
-        with patch('sys.argv', ['finder.py', '--type', 'invalid']):
-            with pytest.raises(SystemExit):
-                main()
-
+        with pytest.raises(SystemExit):
+            main()
@@ -4,217 +4,192 @@ Comprehensive tests for ID generation across all chat finders.
 """
 
 import pytest
-import pathlib
+from pathlib import Path, PurePosixPath
+import posixpath
+import re
 from src.domain.claude_chat_finder import ClaudeChatFinder
 from src.domain.copilot_chat_finder import CopilotChatFinder
 from src.domain.cursor_chats_finder import CursorChatFinder
 from src.domain.base_chat_finder import BaseChatFinder
+from unittest.mock import create_autospec
 
 
-class TestIDGeneration:
-    """Test ID generation methods across all finders."""
+# A valid ID is exactly 16 lowercase hex digits
+_HEX_ID = re.compile(r"[0-9a-f]{16}\Z").match
+
+
+def _autospec_finder(finder_type):
+    """Forge a BaseChatFinder instance whose _generate_unique_id is the real method."""
+    finder = create_autospec(BaseChatFinder, instance=True)
+    finder._finder_type = finder_type
+    finder._generate_unique_id = BaseChatFinder._generate_unique_id.__get__(finder)
+    return finder
+
+
+# Path keys are built once at import. The finders only accept concrete
+# pathlib.Path keys, so PurePosixPath cannot stand in for these.
+CLAUDE_PATH_A = Path("/project1/chat.jsonl")
+CLAUDE_PATH_B = Path("/project1/chat2.jsonl")
+CLAUDE_PATH_OTHER_PROJECT = Path("/project2/chat.jsonl")
+COPILOT_PATH_A = Path("/workspace1/chatSessions/chat.json")
+COPILOT_PATH_B = Path("/workspace1/chatSessions/chat2.json")
+COPILOT_PATH_OTHER_WORKSPACE = Path("/workspace2/chatSessions/chat.json")
+SPECIAL_CHARS_PATH = Path("/project with spaces/file-name.jsonl")
+UNICODE_PATH = Path("/project/文件.jsonl")
+LONG_PATH = Path("/" + "a" * 200 + "/file.jsonl")
+
+# Keys for the finder-type salt property: plain, separator-laden, unicode, long
+SALT_KEYS = [
+    "test_key",
+    "k",
+    "project/chat.jsonl",
+    "composer_123:/path/to/db.vscdb",
+    "文件 with spaces",
+    "x" * 64,
+]
+
+# (finder fixture, key, key for another item in the same container, same item in another container)
+CHAT_ID_CASES = [
+    (
+        "claude",
+        CLAUDE_PATH_A,
+        CLAUDE_PATH_B,
+        CLAUDE_PATH_OTHER_PROJECT,
+    ),
+    (
+        "copilot",
+        COPILOT_PATH_A,
+        COPILOT_PATH_B,
+        COPILOT_PATH_OTHER_WORKSPACE,
+    ),
+    (
+        "cursor",
+        ("composer_123", "/path/to/db.vscdb", "workspace1"),
+        ("composer_456", "/path/to/db.vscdb", "workspace1"),
+        ("composer_123", "/path/to/db2.vscdb", "workspace1"),
+    ),
+]
+
+
+@pytest.fixture(scope="session")
+def claude():
+    """Shared Claude finder; ID generation does not mutate it."""
+    return ClaudeChatFinder()
+
+
+@pytest.fixture(scope="session")
+def copilot():
+    """Shared Copilot finder; ID generation does not mutate it."""
+    return CopilotChatFinder()
+
+
+@pytest.fixture(scope="session")
+def cursor():
+    """Shared Cursor finder; ID generation does not mutate it."""
+    return CursorChatFinder()
+
+
+@pytest.fixture
+def fake_resolve(monkeypatch):
+    """Make Path.resolve a pure string normalization with no filesystem access."""
+    monkeypatch.setattr(
+        Path, "resolve",
+        lambda self, strict=False: PurePosixPath(posixpath.normpath(str(self))),
+    )
+
+
+def test_generate_unique_id_base():
+    """Test _generate_unique_id in base class."""
+    finder = _autospec_finder("f1")
     
-    def test_generate_unique_id_base(self):
-        """Test _generate_unique_id in base class."""
-        class TestFinder(BaseChatFinder):
-            def get_storage_root(self): pass
-            def find_all_chat_files(self): pass
-            def _generate_chat_id(self, x): pass
-            def _extract_metadata_lightweight(self, x): pass
-            def _parse_chat_full(self, x): pass
-        
-        finder = TestFinder()
-        
-        # Test deterministic generation
-        key = "test_key_123"
-        id1 = finder._generate_unique_id(key)
-        id2 = finder._generate_unique_id(key)
-        assert id1 == id2
-        assert len(id1) == 16
-        assert all(c in '0123456789abcdef' for c in id1)
-        
-        # Test different keys produce different IDs
-        id3 = finder._generate_unique_id("different_key")
-        assert id1 != id3
-        
-        # Test that finder type is included in hash
-        class TestFinder2(BaseChatFinder):
-            def get_storage_root(self): pass
-            def find_all_chat_files(self): pass
-            def _generate_chat_id(self, x): pass
-            def _extract_metadata_lightweight(self, x): pass
-            def _parse_chat_full(self, x): pass
-        
-        finder2 = TestFinder2()
-        id4 = finder2._generate_unique_id(key)
-        # Different finder types should produce different IDs for same key
-        assert id1 != id4
+    # Test deterministic generation
+    key = "test_key_123"
+    id1 = finder._generate_unique_id(key)
+    id2 = finder._generate_unique_id(key)
+    assert id1 == id2
+    assert _HEX_ID(id1) is not None
     
-    def test_claude_generate_chat_id(self):
-        """Test Claude chat ID generation."""
-        finder = ClaudeChatFinder()
-        
-        # Test with valid path
-        test_path = pathlib.Path("/project1/chat.jsonl")
-        chat_id = finder._generate_chat_id(test_path)
-        assert len(chat_id) == 16
-        assert isinstance(chat_id, str)
-        
-        # Test deterministic
-        chat_id2 = finder._generate_chat_id(test_path)
-        assert chat_id == chat_id2
-        
-        # Test different files produce different IDs
-        test_path2 = pathlib.Path("/project1/chat2.jsonl")
-        chat_id3 = finder._generate_chat_id(test_path2)
-        assert chat_id != chat_id3
-        
-        # Test different projects produce different IDs
-        test_path3 = pathlib.Path("/project2/chat.jsonl")
-        chat_id4 = finder._generate_chat_id(test_path3)
-        assert chat_id != chat_id4
-        
-        # Test invalid input
-        assert finder._generate_chat_id("not_a_path") == ""
-        assert finder._generate_chat_id(None) == ""
-        assert finder._generate_chat_id(123) == ""
+    # Test different keys produce different IDs
+    id3 = finder._generate_unique_id("different_key")
+    assert id1 != id3
+
+
+@pytest.mark.parametrize("finder_name,key,other_item,other_container", CHAT_ID_CASES)
+def test_generate_chat_id(request, finder_name, key, other_item, other_container):
+    """Test chat ID generation is deterministic and distinguishes items and containers."""
+    finder = request.getfixturevalue(finder_name)
     
-    def test_copilot_generate_chat_id(self):
-        """Test Copilot chat ID generation."""
-        finder = CopilotChatFinder()
-        
-        # Test with valid path
-        test_path = pathlib.Path("/workspace1/chatSessions/chat.json")
-        chat_id = finder._generate_chat_id(test_path)
-        assert len(chat_id) == 16
-        assert isinstance(chat_id, str)
-        
-        # Test deterministic
-        chat_id2 = finder._generate_chat_id(test_path)
-        assert chat_id == chat_id2
-        
-        # Test different workspaces produce different IDs
-        test_path2 = pathlib.Path("/workspace2/chatSessions/chat.json")
-        chat_id3 = finder._generate_chat_id(test_path2)
-        assert chat_id != chat_id3
-        
-        # Test different files in same workspace produce different IDs
-        test_path3 = pathlib.Path("/workspace1/chatSessions/chat2.json")
-        chat_id4 = finder._generate_chat_id(test_path3)
-        assert chat_id != chat_id4
-        
-        # Test invalid input
-        assert finder._generate_chat_id("not_a_path") == ""
-        assert finder._generate_chat_id(None) == ""
+    chat_id = finder._generate_chat_id(key)
+    assert isinstance(chat_id, str)
+    assert _HEX_ID(chat_id) is not None
+    assert finder._generate_chat_id(key) == chat_id
     
-    def test_cursor_generate_chat_id(self):
-        """Test Cursor chat ID generation."""
-        finder = CursorChatFinder()
-        
-        # Test with valid tuple
-        test_tuple = ("composer_123", "/path/to/db.vscdb", "workspace1")
-        chat_id = finder._generate_chat_id(test_tuple)
-        assert len(chat_id) == 16
-        assert isinstance(chat_id, str)
-        
-        # Test deterministic
-        chat_id2 = finder._generate_chat_id(test_tuple)
-        assert chat_id == chat_id2
-        
-        # Test different composers produce different IDs
-        test_tuple2 = ("composer_456", "/path/to/db.vscdb", "workspace1")
-        chat_id3 = finder._generate_chat_id(test_tuple2)
-        assert chat_id != chat_id3
-        
-        # Test different databases produce different IDs
-        test_tuple3 = ("composer_123", "/path/to/db2.vscdb", "workspace1")
-        chat_id4 = finder._generate_chat_id(test_tuple3)
-        assert chat_id != chat_id4
-        
-        # Test path normalization (same path, different format)
-        test_tuple4 = ("composer_123", "C:\\path\\to\\db.vscdb", "workspace1")
-        chat_id5 = finder._generate_chat_id(test_tuple4)
-        # Should be same or different depending on normalization
-        assert len(chat_id5) == 16
-        
-        # Test invalid input
-        assert finder._generate_chat_id("not_a_tuple") == ""
-        assert finder._generate_chat_id(("id",)) == ""  # Too short
-        assert finder._generate_chat_id(()) == ""  # Empty
-        assert finder._generate_chat_id(None) == ""
+    # Different item in the same container, and same item in another container
+    assert finder._generate_chat_id(other_item) != chat_id
+    assert finder._generate_chat_id(other_container) != chat_id
+
+
+@pytest.mark.parametrize("finder_name", ["claude", "copilot", "cursor"])
+@pytest.mark.parametrize("bad", ["not_a_key", None, 123, (), ("id",)])
+def test_generate_chat_id_invalid_input(request, finder_name, bad):
+    """Test chat ID generation returns an empty string for invalid input."""
+    assert request.getfixturevalue(finder_name)._generate_chat_id(bad) == ""
+
+
+def test_cursor_generate_chat_id_path_normalization(cursor, fake_resolve):
+    """Test that Cursor chat ID handles path normalization correctly."""
+    tuple1 = ("composer_123", "/data/workspace/../test.vscdb", "workspace1")
+    tuple2 = ("composer_123", "/data/test.vscdb", "workspace1")
     
-    def test_cursor_generate_chat_id_path_normalization(self):
-        """Test that Cursor chat ID handles path normalization correctly."""
-        finder = CursorChatFinder()
-        
-        # Test with absolute path that can be resolved
-        import tempfile
-        with tempfile.TemporaryDirectory() as tmpdir:
-            db_path = pathlib.Path(tmpdir) / "test.vscdb"
-            db_path.touch()
-            
-            tuple1 = ("composer_123", str(db_path), "workspace1")
-            tuple2 = ("composer_123", str(db_path.resolve()), "workspace1")
-            
-            id1 = finder._generate_chat_id(tuple1)
-            id2 = finder._generate_chat_id(tuple2)
-            # Should produce same ID after normalization
-            assert id1 == id2
+    # Should produce same ID after normalization
+    assert cursor._generate_chat_id(tuple1) == cursor._generate_chat_id(tuple2)
+
+
+def test_cursor_generate_chat_id_resolves_real_path(cursor, tmp_path):
+    """Test that Cursor chat IDs match for an on-disk database and its resolved path."""
+    db_path = tmp_path / "test.vscdb"
+    db_path.touch()
     
-    def test_cursor_generate_chat_id_path_fallback(self):
-        """Test Cursor chat ID with path that can't be resolved."""
-        finder = CursorChatFinder()
-        
-        # Test with non-existent path (should use fallback normalization)
-        non_existent = "/nonexistent/path/to/db.vscdb"
-        tuple1 = ("composer_123", non_existent, "workspace1")
-        chat_id = finder._generate_chat_id(tuple1)
-        assert len(chat_id) == 16
-        
-        # Test with Windows-style path
-        windows_path = "C:\\Users\\test\\db.vscdb"
-        tuple2 = ("composer_123", windows_path, "workspace1")
-        chat_id2 = finder._generate_chat_id(tuple2)
-        assert len(chat_id2) == 16
+    tuple1 = ("composer_123", str(tmp_path / "workspace" / ".." / "test.vscdb"), "workspace1")
+    tuple2 = ("composer_123", str(db_path.resolve()), "workspace1")
     
-    def test_id_uniqueness_across_finders(self):
-        """Test that same key produces different IDs for different finder types."""
-        claude_finder = ClaudeChatFinder()
-        copilot_finder = CopilotChatFinder()
-        cursor_finder = CursorChatFinder()
-        
-        # Same unique key should produce different IDs for different finders
-        key = "test_key"
-        claude_id = claude_finder._generate_unique_id(key)
-        copilot_id = copilot_finder._generate_unique_id(key)
-        cursor_id = cursor_finder._generate_unique_id(key)
-        
-        # All should be different
-        assert claude_id != copilot_id
-        assert claude_id != cursor_id
-        assert copilot_id != cursor_id
-        
-        # All should be valid 16-char hex strings
-        for id_val in [claude_id, copilot_id, cursor_id]:
-            assert len(id_val) == 16
-            assert all(c in '0123456789abcdef' for c in id_val)
+    assert cursor._generate_chat_id(tuple1) == cursor._generate_chat_id(tuple2)
+
+
+def test_cursor_generate_chat_id_path_fallback(cursor):
+    """Test Cursor chat ID with path that can't be resolved."""
+    # Test with non-existent path (should use fallback normalization)
+    non_existent = "/nonexistent/path/to/db.vscdb"
+    tuple1 = ("composer_123", non_existent, "workspace1")
+    chat_id = cursor._generate_chat_id(tuple1)
+    assert _HEX_ID(chat_id) is not None
     
-    def test_id_generation_with_special_characters(self):
-        """Test ID generation with special characters in keys."""
-        finder = ClaudeChatFinder()
-        
-        # Test with special characters
-        special_path = pathlib.Path("/project with spaces/file-name.jsonl")
-        chat_id = finder._generate_chat_id(special_path)
-        assert len(chat_id) == 16
-        
-        # Test with unicode characters
-        unicode_path = pathlib.Path("/project/文件.jsonl")
-        chat_id2 = finder._generate_chat_id(unicode_path)
-        assert len(chat_id2) == 16
-        
-        # Test with very long path
-        long_path = pathlib.Path("/" + "a" * 200 + "/file.jsonl")
-        chat_id3 = finder._generate_chat_id(long_path)
-        assert len(chat_id3) == 16
+    # Test with Windows-style path
+    windows_path = "C:\\Users\\test\\db.vscdb"
+    tuple2 = ("composer_123", windows_path, "workspace1")
+    chat_id2 = cursor._generate_chat_id(tuple2)
+    assert _HEX_ID(chat_id2) is not None
+
+
+@pytest.mark.parametrize("key", SALT_KEYS)
+def test_ids_salted_by_finder_type(claude, copilot, cursor, key):
+    """Test that the same key produces a distinct valid ID for each finder type."""
+    ids = {finder._generate_unique_id(key) for finder in (claude, copilot, cursor)}
+    assert len(ids) == 3
+    for id_val in ids:
+        assert _HEX_ID(id_val) is not None
 
+
+def test_id_generation_with_special_characters(claude):
+    """Test ID generation with special characters in keys."""
+    # Test with special characters
+    chat_id = claude._generate_chat_id(SPECIAL_CHARS_PATH)
+    assert _HEX_ID(chat_id) is not None
+    
+    # Test with unicode characters
+    chat_id2 = claude._generate_chat_id(UNICODE_PATH)
+    assert _HEX_ID(chat_id2) is not None
+    
+    # Test with very long path
+    chat_id3 = claude._generate_chat_id(LONG_PATH)
+    assert _HEX_ID(chat_id3) is not None
@@ -10,34 +10,15 @@ from src.domain.tool_normalizer import tool_name_normalization
 class TestToolNormalizer:
     """Test cases for tool_normalizer."""
     
-    def test_unknown_ai_type(self):
-        """Test tool normalization with unknown AI type."""
-        result = tool_name_normalization("unknown_ai", "some_tool")
-        assert result is None
-    
-    def test_explicitly_skipped_tool(self):
-        """Test tool normalization with explicitly skipped tool (mapped to None)."""
+    @pytest.mark.parametrize("ai_type,tool_name,expected", [
+        pytest.param("unknown_ai", "some_tool", None, id="unknown_ai_type"),
         # copilot_applyPatch is explicitly mapped to None
-        result = tool_name_normalization("copilot", "copilot_applyPatch")
-        assert result is None
-    
-    def test_cursor_tool_mapping(self):
-        """Test cursor tool normalization."""
-        result = tool_name_normalization("cursor", "read_file")
-        assert result == "read"
-    
-    def test_claude_tool_mapping(self):
-        """Test claude tool normalization."""
-        result = tool_name_normalization("claude", "Read")
-        assert result == "read"
-    
-    def test_copilot_tool_mapping(self):
-        """Test copilot tool normalization."""
-        result = tool_name_normalization("copilot", "copilot_readFile")
-        assert result == "read"
-    
-    def test_unmapped_tool(self):
-        """Test tool normalization with unmapped tool."""
-        result = tool_name_normalization("cursor", "unknown_tool")
-        assert result is None
-
+        pytest.param("copilot", "copilot_applyPatch", None, id="explicitly_skipped_tool"),
+        pytest.param("cursor", "read_file", "read", id="cursor_tool_mapping"),
+        pytest.param("claude", "Read", "read", id="claude_tool_mapping"),
+        pytest.param("copilot", "copilot_readFile", "read", id="copilot_tool_mapping"),
+        pytest.param("cursor", "unknown_tool", None, id="unmapped_tool"),
+    ])
+    def test_tool_name_normalization(self, ai_type, tool_name, expected):
+        """Test tool name normalization across AI types."""
+        assert tool_name_normalization(ai_type, tool_name) == expected